@@ -0,0 +1,212 @@
+"""Bulk synthetic roles, users and posts streamed into Postgres with COPY.
+
+Run from the backend directory: python -m benchmarks.generate_data --users 1000000 --posts 10000000
+Ids are generated client-side so posts can reference their authors without reading them back.
+Post text lengths follow a lognormal distribution and authors a Zipf distribution (--author-skew 0
+spreads posts evenly). All users share a few precomputed bcrypt hashes of --password.
+The row_counter triggers and the post search_vector column are maintained by Postgres during COPY;
+--rebuild-search-index drops the GIN index for the load and recreates it afterwards.
+"""
+import argparse
+import asyncio
+import itertools
+import math
+import random
+import sys
+import time
+import uuid
+import asyncpg
+from sqlalchemy.engine import make_url
+from configuration import settings
+from utils.hasher import get_hash
+
+WORDS = (
+    "пост текст пользователь роль данные запрос ответ сервер база индекс страница поиск кошка собака "
+    "город время работа вопрос пример система проект число строка список значение результат новость "
+    "день неделя год история статья автор комментарий заголовок сообщение"
+).split()
+
+STANDARD_ROLES = {
+    settings.default_role_name: (True, False, False, False),
+    "writer": (True, True, False, False),
+    "admin": (True, True, True, True)
+}
+
+
+def connection_dsn() -> str:
+    return make_url(settings.database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def build_corpus(size: int, rng: random.Random) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+class PostRecords:
+    def __init__(self, author_ids: list[uuid.UUID], args, rng: random.Random):
+        self.author_ids = author_ids
+        self.rng = rng
+        self.text_mu = math.log(args.text_median)
+        self.text_sigma = args.text_sigma
+        self.text_max = args.text_max
+        self.corpus = build_corpus(size=args.text_max * 4, rng=rng)
+        # Author rank r gets weight 1 / r^skew; cumulative weights make every pick a binary search
+        self.author_weights = list(itertools.accumulate(
+            1 / (rank ** args.author_skew) for rank in range(1, len(author_ids) + 1)
+        ))
+
+    def text(self) -> str:
+        length = min(self.text_max, max(1, int(self.rng.lognormvariate(self.text_mu, self.text_sigma))))
+        start = self.rng.randrange(len(self.corpus) - length)
+        return self.corpus[start:start + length]
+
+    def batch(self, first: int, size: int) -> list[tuple]:
+        authors = self.rng.choices(self.author_ids, cum_weights=self.author_weights, k=size)
+        return [
+            (uuid.uuid4(), f"Пост {number}", self.text(), author_id)
+            for number, author_id in zip(range(first, first + size), authors)
+        ]
+
+
+async def ensure_roles(connection: asyncpg.Connection, extra_roles: int, rng: random.Random) -> dict[str, uuid.UUID]:
+    role_ids = {}
+    for name, rights in STANDARD_ROLES.items():
+        role_id = await connection.fetchval("SELECT id FROM role WHERE name = $1 LIMIT 1", name)
+        if role_id is None:
+            role_id = uuid.uuid4()
+            await connection.execute(
+                "INSERT INTO role (id, name, read_posts_access, write_posts_access, delete_posts_access, "
+                "manage_roles_access) VALUES ($1, $2, $3, $4, $5, $6)",
+                role_id, name, *rights
+            )
+        role_ids[name] = role_id
+
+    records = [
+        (uuid.uuid4(), f"role-{uuid.uuid4().hex[:8]}", True, rng.random() < 0.5, rng.random() < 0.2, False)
+        for _ in range(extra_roles)
+    ]
+    await connection.copy_records_to_table(
+        "role",
+        records=records,
+        columns=["id", "name", "read_posts_access", "write_posts_access", "delete_posts_access", "manage_roles_access"]
+    )
+    role_ids.update((record[1], record[0]) for record in records)
+    return role_ids
+
+
+async def copy_batches(pool: asyncpg.Pool, table: str, columns: list[str], batches, total: int, workers: int) -> None:
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    copied = 0
+    started = time.perf_counter()
+
+    async def worker():
+        nonlocal copied
+        async with pool.acquire() as connection:
+            while (records := await queue.get()) is not None:
+                await connection.copy_records_to_table(table, records=records, columns=columns)
+                copied += len(records)
+                rate = copied / (time.perf_counter() - started)
+                print(f"\r{table}: {copied}/{total} rows, {rate:,.0f} rows/s", end="", file=sys.stderr)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    for records in batches:
+        await queue.put(records)
+        # Hand the loop to the COPY workers between generated batches
+        await asyncio.sleep(0)
+    for _ in tasks:
+        await queue.put(None)
+    await asyncio.gather(*tasks)
+    print(file=sys.stderr)
+
+
+async def generate(args) -> None:
+    rng = random.Random(args.seed)
+    run_id = uuid.uuid4().hex[:8]
+    password_hashes = [get_hash(args.password) for _ in range(args.password_hashes)]
+
+    pool = await asyncpg.create_pool(connection_dsn(), min_size=args.workers, max_size=args.workers)
+    async with pool.acquire() as connection:
+        role_ids = await ensure_roles(connection=connection, extra_roles=args.roles, rng=rng)
+    role_choices = [role_ids[settings.default_role_name], role_ids["writer"]]
+    role_weights = [1 - args.writer_share, args.writer_share]
+
+    author_ids = [uuid.uuid4() for _ in range(args.users)]
+    # Shuffled so the most prolific authors are not always the first users created
+    rng.shuffle(author_ids)
+
+    def user_batches():
+        for first in range(0, args.users, args.batch_size):
+            ids = author_ids[first:first + args.batch_size]
+            roles = rng.choices(role_choices, weights=role_weights, k=len(ids))
+            yield [
+                (user_id, "Имя", "Фамилия", "Отчество", f"user-{run_id}-{first + number}@example.com",
+                 rng.choice(password_hashes), True, role_id)
+                for number, (user_id, role_id) in enumerate(zip(ids, roles))
+            ]
+
+    await copy_batches(
+        pool=pool,
+        table="user",
+        columns=["id", "name", "surname", "patronymic", "email", "password", "is_active", "role_id"],
+        batches=user_batches(),
+        total=args.users,
+        workers=args.workers
+    )
+
+    if args.posts and author_ids:
+        posts = PostRecords(author_ids=author_ids, args=args, rng=rng)
+        if args.rebuild_search_index:
+            async with pool.acquire() as connection:
+                await connection.execute("DROP INDEX IF EXISTS ix_post_search_vector")
+        await copy_batches(
+            pool=pool,
+            table="post",
+            columns=["id", "title", "text", "author_id"],
+            batches=(
+                posts.batch(first=first, size=min(args.batch_size, args.posts - first))
+                for first in range(0, args.posts, args.batch_size)
+            ),
+            total=args.posts,
+            workers=args.workers
+        )
+        async with pool.acquire() as connection:
+            if args.rebuild_search_index:
+                print("post: rebuilding ix_post_search_vector", file=sys.stderr)
+                await connection.execute("CREATE INDEX ix_post_search_vector ON post USING gin (search_vector)")
+            await connection.execute("ANALYZE post")
+
+    async with pool.acquire() as connection:
+        await connection.execute('ANALYZE "user"')
+    await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--posts", type=int, default=1000000)
+    parser.add_argument("--roles", type=int, default=0, help="extra roles besides the standard ones")
+    parser.add_argument("--writer-share", type=float, default=0.1)
+    parser.add_argument("--text-median", type=int, default=400, help="median post length in characters")
+    parser.add_argument("--text-sigma", type=float, default=1.0)
+    parser.add_argument("--text-max", type=int, default=20000)
+    parser.add_argument("--author-skew", type=float, default=1.1)
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--password-hashes", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rebuild-search-index", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    asyncio.run(generate(args))
+    print(f"done in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Verification cost of decode_jwt per request, cold vs. cached.
+
+Run from the backend directory: python -m benchmarks.jwt_decode_benchmark
+"""
+import argparse
+import timeit
+import uuid
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from utils.jwt_utils import encode_jwt, decode_jwt, purge_verified_tokens
+from utils.key_manager import key_manager
+
+
+def generate_private_key() -> str:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    ).decode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    key_manager.add_key(kid=key_manager.active_kid, pem=generate_private_key())
+    token = encode_jwt(payload={"sub": str(uuid.uuid4())}, token_type="access")
+
+    def cold():
+        purge_verified_tokens()
+        decode_jwt(token=token)
+
+    def cached():
+        decode_jwt(token=token)
+
+    for name, func in (("cold", cold), ("cached", cached)):
+        func()
+        seconds = timeit.timeit(func, number=args.iterations)
+        print(f"{name:>6}: {seconds / args.iterations * 1e6:10.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
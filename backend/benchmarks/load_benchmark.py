@@ -0,0 +1,377 @@
+"""End-to-end HTTP latency and throughput of the main API scenarios against a seeded database.
+
+Run from the backend directory: python -m benchmarks.load_benchmark --output results.json
+The app runs in-process unless --base-url points at a running server. Rate and concurrency
+limits shed benchmark traffic, disable them for the run: RATE_LIMIT_ENABLED=false CONCURRENCY_LIMIT_ENABLED=false
+The seeded dataset is named after --users and --posts and reused by later runs; rows written by the
+scenarios are removed afterwards. Compare with a stored run via --baseline; the exit status is 1 when
+a scenario regresses and 2 when the baseline was recorded against a different dataset.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager
+import httpx
+from sqlalchemy import delete, func, insert, select, update
+from configuration import settings
+from database.database import async_session
+from models.post import Post
+from models.role import Role
+from models.user import User
+from utils.cursor import encode_id_cursor
+from utils.hasher import get_hash
+
+PASSWORD = "benchmark-password"
+
+ROLES = {
+    settings.default_role_name: (True, False, False, False),
+    "writer": (True, True, False, False),
+    "admin": (True, True, True, True)
+}
+
+
+class Dataset:
+    def __init__(self, name: str):
+        self.name = name
+        self.role_ids: dict[str, uuid.UUID] = {}
+        self.emails: list[str] = []
+        self.user_ids: list[uuid.UUID] = []
+        self.post_ids: list[uuid.UUID] = []
+        self.deep_pages: list[int] = []
+        self.deep_cursors: list[str] = []
+        self.admin_email = ""
+        self.admin_token = ""
+        self.post_count = 0
+
+    @property
+    def user_prefix(self) -> str:
+        return f"bench-{self.name}-user-"
+
+    @property
+    def registered_prefix(self) -> str:
+        return f"bench-{self.name}-registered-"
+
+    @property
+    def created_title(self) -> str:
+        return f"Пост {self.name} created"
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "users": len(self.user_ids),
+            "posts": len(self.post_ids),
+            "post_count": self.post_count
+        }
+
+
+async def ensure_roles(session, dataset: Dataset) -> None:
+    for name, rights in ROLES.items():
+        role_id = await session.scalar(select(Role.id).where(Role.name == name).limit(1))
+        if role_id is None:
+            role_id = await session.scalar(insert(Role).values(
+                name=name,
+                read_posts_access=rights[0],
+                write_posts_access=rights[1],
+                delete_posts_access=rights[2],
+                manage_roles_access=rights[3]
+            ).returning(Role.id))
+        dataset.role_ids[name] = role_id
+
+
+async def insert_dataset(session, dataset: Dataset, users: int, posts: int) -> None:
+    password_hash = get_hash(PASSWORD)
+    dataset.emails = [f"{dataset.user_prefix}{number}@example.com" for number in range(users)]
+    dataset.user_ids = [uuid.uuid4() for _ in range(users)]
+    await session.execute(insert(User), [
+        {
+            "id": user_id,
+            "name": "Бенчмарк",
+            "surname": "Пользователь",
+            "patronymic": str(number),
+            "email": email,
+            "password": password_hash,
+            "is_active": True,
+            "role_id": dataset.role_ids["admin" if number == 0 else settings.default_role_name]
+        }
+        for number, (user_id, email) in enumerate(zip(dataset.user_ids, dataset.emails))
+    ])
+
+    dataset.post_ids = [uuid.uuid4() for _ in range(posts)]
+    for start in range(0, posts, 5000):
+        await session.execute(insert(Post), [
+            {
+                "id": post_id,
+                "title": f"Пост {dataset.name} {start + number}",
+                "text": "Текст поста для нагрузочного теста " * random.randint(1, 20),
+                "author_id": random.choice(dataset.user_ids)
+            }
+            for number, post_id in enumerate(dataset.post_ids[start:start + 5000])
+        ])
+
+
+async def load_dataset(session, dataset: Dataset) -> None:
+    users = (await session.execute(
+        select(User.id, User.email).where(User.email.startswith(dataset.user_prefix)).order_by(User.email)
+    )).all()
+    dataset.user_ids = [user.id for user in users]
+    dataset.emails = [user.email for user in users]
+    dataset.post_ids = list(await session.scalars(
+        select(Post.id).where(Post.author_id.in_(dataset.user_ids), Post.title != dataset.created_title)
+    ))
+
+
+async def reset(dataset: Dataset) -> None:
+    # Rows written by the scenarios are removed, so every run measures the same dataset
+    async with async_session() as session:
+        await session.execute(delete(Post).where(Post.title == dataset.created_title))
+        await session.execute(delete(User).where(User.email.startswith(dataset.registered_prefix)))
+        await session.execute(
+            update(User)
+            .where(User.email.startswith(dataset.user_prefix), User.email != dataset.admin_email)
+            .values(role_id=dataset.role_ids[settings.default_role_name])
+        )
+        await session.commit()
+
+
+async def seed(users: int, posts: int) -> Dataset:
+    dataset = Dataset(name=f"{users}x{posts}")
+    dataset.admin_email = f"{dataset.user_prefix}0@example.com"
+    async with async_session() as session:
+        await ensure_roles(session=session, dataset=dataset)
+        if await session.scalar(select(User.id).where(User.email == dataset.admin_email)) is None:
+            await insert_dataset(session=session, dataset=dataset, users=users, posts=posts)
+        else:
+            await load_dataset(session=session, dataset=dataset)
+        await session.commit()
+    await reset(dataset=dataset)
+
+    async with async_session() as session:
+        dataset.post_count = await session.scalar(select(func.count()).select_from(Post))
+        last_page = max(dataset.post_count // 20, 1)
+        dataset.deep_pages = list(range(max(last_page - 10, 2), last_page + 1))
+        # A cursor after the last post of the previous page lands on the same rows as the deep offset page
+        for page in dataset.deep_pages:
+            after_id = await session.scalar(select(Post.id).order_by(Post.id).offset((page - 1) * 20 - 1).limit(1))
+            dataset.deep_cursors.append(encode_id_cursor(after_id))
+    return dataset
+
+
+@asynccontextmanager
+async def open_client(base_url: str | None):
+    if base_url is not None:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            yield client
+        return
+    from main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=30) as client:
+            yield client
+
+
+def authorization(dataset: Dataset) -> dict[str, str]:
+    return {"Authorization": f"Bearer {dataset.admin_token}"}
+
+
+async def login(client: httpx.AsyncClient, dataset: Dataset) -> httpx.Response:
+    return await client.post("/user/login", json={"email": random.choice(dataset.emails), "password": PASSWORD})
+
+
+async def registration(client: httpx.AsyncClient, dataset: Dataset) -> httpx.Response:
+    return await client.post("/user/registration", json={
+        "name": "Бенчмарк",
+        "surname": "Регистрация",
+        "patronymic": "",
+        "email": f"{dataset.registered_prefix}{uuid.uuid4().hex}@example.com",
+        "password": PASSWORD,
+        "repeat_password": PASSWORD
+    })
+
+
+async def post_create(client: httpx.AsyncClient, dataset: Dataset) -> httpx.Response:
+    return await client.post(
+        "/post",
+        json={"title": dataset.created_title, "text": "Текст поста для нагрузочного теста"},
+        headers=authorization(dataset)
+    )
+
+
+async def post_get(client: httpx.AsyncClient, dataset: Dataset) -> httpx.Response:
+    return await client.get("/post", params={"post_id": str(random.choice(dataset.post_ids))}, headers=authorization(dataset))
+
+
+async def post_list(client: httpx.AsyncClient, dataset: Dataset) -> httpx.Response:
+    return await client.get("/post/all", params={"page_size": 20}, headers=authorization(dataset))
+
+
+async def deep_offset_page(client: httpx.AsyncClient, dataset: Dataset) -> httpx.Response:
+    return await client.get(
+        "/post/all",
+        params={"page": random.choice(dataset.deep_pages), "page_size": 20, "include_total": "false"},
+        headers=authorization(dataset)
+    )
+
+
+async def deep_cursor_page(client: httpx.AsyncClient, dataset: Dataset) -> httpx.Response:
+    return await client.get(
+        "/post/all",
+        params={"cursor": random.choice(dataset.deep_cursors), "page_size": 20, "include_total": "false"},
+        headers=authorization(dataset)
+    )
+
+
+async def role_change(client: httpx.AsyncClient, dataset: Dataset) -> httpx.Response:
+    return await client.patch(
+        "/user/change-role",
+        json={
+            "user_id": str(random.choice(dataset.user_ids[1:])),
+            "role_id": str(dataset.role_ids[random.choice(("writer", settings.default_role_name))])
+        },
+        headers=authorization(dataset)
+    )
+
+
+SCENARIOS = {
+    "login": login,
+    "registration": registration,
+    "post_create": post_create,
+    "post_get": post_get,
+    "post_list": post_list,
+    "deep_offset_page": deep_offset_page,
+    "deep_cursor_page": deep_cursor_page,
+    "role_change": role_change
+}
+
+
+def percentile(latencies: list[float], rank: float) -> float:
+    index = min(len(latencies) - 1, max(0, round(rank / 100 * len(latencies)) - 1))
+    return latencies[index]
+
+
+async def run_scenario(client: httpx.AsyncClient, dataset: Dataset, scenario, requests: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await scenario(client=client, dataset=dataset)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "throughput_rps": requests / elapsed
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {previous[metric]:.2f} -> {current[metric]:.2f}")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput_rps {previous['throughput_rps']:.1f} -> {current['throughput_rps']:.1f}"
+            )
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+async def run(args) -> dict:
+    dataset = await seed(users=args.users, posts=args.posts)
+    try:
+        scenarios = await run_scenarios(args=args, dataset=dataset)
+    finally:
+        await reset(dataset=dataset)
+    return {
+        "dataset": dataset.describe(),
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "scenarios": scenarios
+    }
+
+
+async def run_scenarios(args, dataset: Dataset) -> dict:
+    async with open_client(base_url=args.base_url) as client:
+        response = await client.post("/user/login", json={"email": dataset.admin_email, "password": PASSWORD})
+        response.raise_for_status()
+        dataset.admin_token = response.json()["token_info"]["token"]
+
+        scenarios = {}
+        for name in args.scenarios:
+            scenario = SCENARIOS[name]
+            for _ in range(args.warmup):
+                await scenario(client=client, dataset=dataset)
+            scenarios[name] = await run_scenario(
+                client=client,
+                dataset=dataset,
+                scenario=scenario,
+                requests=args.requests,
+                concurrency=args.concurrency
+            )
+            print(f"{name:>16}: p50 {scenarios[name]['p50_ms']:8.2f} ms  p95 {scenarios[name]['p95_ms']:8.2f} ms  "
+                  f"p99 {scenarios[name]['p99_ms']:8.2f} ms  {scenarios[name]['throughput_rps']:8.1f} req/s  "
+                  f"errors {scenarios[name]['errors']}", file=sys.stderr)
+    return scenarios
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    report = json.dumps(results, indent=2)
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            file.write(report)
+    else:
+        print(report)
+
+    if args.baseline is not None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline.get("dataset") != results["dataset"]:
+            print(f"baseline dataset {baseline.get('dataset')} differs from {results['dataset']}, not comparing",
+                  file=sys.stderr)
+            sys.exit(2)
+        regressions = compare(results=results, baseline=baseline, tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Serialization cost of one post listing page per response path.
+
+Run from the backend directory: python -m benchmarks.serialization_benchmark
+"""
+import argparse
+import json
+import timeit
+import uuid
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from schemas.internal.pagination_schemas import PaginationSchema
+from schemas.response.post_response_schemas import PostListItemSchema, PostListResponseSchema
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    rows = [
+        {"id": uuid.uuid4(), "title": f"Пост {number}", "text": "Текст поста " * 40}
+        for number in range(args.page_size)
+    ]
+    pagination = {"page": 1, "page_size": args.page_size, "total_count": 10000, "total_pages": 100}
+    adapter = TypeAdapter(PostListResponseSchema)
+
+    def dicts():
+        # The endpoint returns plain dicts, response_model validates and dumps them
+        content = adapter.validate_python({"pagination": pagination, "posts": rows})
+        adapter.dump_json(content)
+
+    def validated():
+        # The service validates every item, response_model validates the result once more
+        content = PostListResponseSchema(
+            pagination=PaginationSchema(**pagination),
+            posts=[PostListItemSchema(**row) for row in rows]
+        )
+        adapter.dump_json(adapter.validate_python(content))
+
+    def encoder():
+        content = PostListResponseSchema(
+            pagination=PaginationSchema(**pagination),
+            posts=[PostListItemSchema(**row) for row in rows]
+        )
+        json.dumps(jsonable_encoder(content), ensure_ascii=False).encode()
+
+    for name, func in (("dicts", dicts), ("validated", validated), ("encoder", encoder)):
+        func()
+        seconds = timeit.timeit(func, number=args.iterations)
+        print(f"{name:>9}: {seconds / args.iterations * 1e6:10.2f} us/response")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 from pydantic.v1 import BaseSettings
-from typing import ClassVar
+from typing import ClassVar, Optional
 from fastapi.security import HTTPBearer
+from dotenv import load_dotenv
+
+load_dotenv()
 
 
 class Settings(BaseSettings):
@@ -8,6 +11,84 @@ class Settings(BaseSettings):
     expiration_time_of_refresh_token: int = 20160
     expiration_time_of_access_token_for_browser: int = expiration_time_of_access_token*60
     expiration_time_of_refresh_token_for_browser: int = expiration_time_of_refresh_token*60
+    database_url: Optional[str] = None
+    db_echo: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    db_pgbouncer_mode: bool = False
+    database_replica_urls: list[str] = []
+    replica_max_lag: float = 5
+    replica_lag_check_interval: float = 5
+    read_your_writes_window: float = 10
+    read_your_writes_max_users: int = 10000
+    private_key: Optional[str] = None
+    public_key: Optional[str] = None
+    algorithm: str = "RS256"
+    jwt_active_kid: str = "primary"
+    jwt_keys_dir: Optional[str] = None
+    jwks_cache_max_age: int = 300
+    stateless_authorization: bool = False
+    web_concurrency: int = 1
+    role_cache_ttl: float = 300
+    role_cache_max_size: int = 1024
+    default_role_name: str = "user"
+    jwt_cache_max_size: int = 10000
+    jwt_leeway: int = 10
+    count_cache_ttl: float = 30
+    export_chunk_size: int = 1000
+    post_preview_length: int = 200
+    post_cache_control: str = "private, no-cache"
+    post_list_cache_control: str = "private, no-cache"
+    cache_backend: str = "memory"
+    cache_redis_url: str = "redis://localhost:6379/0"
+    cache_channel: str = "cache-invalidation"
+    cache_max_size: int = 10000
+    cache_ttl: float = 60
+    cache_stale_ttl: float = 30
+    cache_ttl_jitter: float = 0.1
+    cache_reconnect_delay: float = 1
+    cache_max_reconnect_delay: float = 30
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "memory"
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
+    rate_limit_max_keys: int = 100000
+    rate_limit_trust_forwarded: bool = False
+    rate_limit_ip_rules: dict[str, str] = {
+        "POST /user/login": "10/60",
+        "POST /user/registration": "10/60",
+        "*": "600/60"
+    }
+    rate_limit_user_rules: dict[str, str] = {
+        "GET /post/all": "120/60",
+        "GET /post/search": "120/60",
+        "GET /post/export": "10/60",
+        "GET /user/all": "120/60",
+        "*": "600/60"
+    }
+    metrics_enabled: bool = True
+    concurrency_limit_enabled: bool = True
+    concurrency_route_classes: dict[str, str] = {
+        "POST /user/login": "auth",
+        "POST /user/registration": "auth",
+        "GET /post/export": "export"
+    }
+    concurrency_limits: dict[str, dict[str, float]] = {
+        "read": {"initial_limit": 40, "min_limit": 4, "max_limit": 200, "latency_target": 0.3},
+        "write": {"initial_limit": 20, "min_limit": 2, "max_limit": 100, "latency_target": 0.5},
+        "auth": {"initial_limit": 8, "min_limit": 1, "max_limit": 32, "latency_target": 1.0},
+        "export": {"initial_limit": 2, "min_limit": 1, "max_limit": 8, "latency_target": 30}
+    }
+    concurrency_backoff_ratio: float = 0.9
+    concurrency_max_queue_size: int = 100
+    concurrency_max_queue_wait: float = 1.0
+    concurrency_retry_after: int = 1
+    hash_pool_kind: str = "thread"
+    hash_pool_workers: int = 4
+    hash_pool_max_queue_size: int = 64
     http_bearer: ClassVar = HTTPBearer()
 
 
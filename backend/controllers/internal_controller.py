@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends
+from dependencies import get_internal_service, get_current_principal
+from schemas.internal.principal_schemas import PrincipalSchema
+from schemas.response.internal_response_schemas import CacheStatsResponseSchema, HashPoolStatsResponseSchema
+from schemas.response.internal_response_schemas import PoolStatsResponseSchema, ResponseCacheStatsResponseSchema
+from schemas.response.internal_response_schemas import SingleFlightStatsResponseSchema, ConcurrencyLimiterStatsResponseSchema
+from services.internal_service import InternalService
+
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"]
+)
+
+
+@router.get("/role-cache", response_model=CacheStatsResponseSchema)
+async def get_role_cache_stats(
+        principal: PrincipalSchema = Depends(get_current_principal),
+        internal_service: InternalService = Depends(get_internal_service)
+):
+    return await internal_service.get_role_cache_stats(principal=principal)
+
+
+@router.get("/hash-pool", response_model=HashPoolStatsResponseSchema)
+async def get_hash_pool_stats(
+        principal: PrincipalSchema = Depends(get_current_principal),
+        internal_service: InternalService = Depends(get_internal_service)
+):
+    return await internal_service.get_hash_pool_stats(principal=principal)
+
+
+@router.get("/pool", response_model=PoolStatsResponseSchema)
+async def get_pool_stats(
+        principal: PrincipalSchema = Depends(get_current_principal),
+        internal_service: InternalService = Depends(get_internal_service)
+):
+    return await internal_service.get_pool_stats(principal=principal)
+
+
+@router.get("/cache", response_model=ResponseCacheStatsResponseSchema)
+async def get_cache_stats(
+        principal: PrincipalSchema = Depends(get_current_principal),
+        internal_service: InternalService = Depends(get_internal_service)
+):
+    return await internal_service.get_cache_stats(principal=principal)
+
+
+@router.get("/single-flight", response_model=list[SingleFlightStatsResponseSchema])
+async def get_single_flight_stats(
+        principal: PrincipalSchema = Depends(get_current_principal),
+        internal_service: InternalService = Depends(get_internal_service)
+):
+    return await internal_service.get_single_flight_stats(principal=principal)
+
+
+@router.get("/concurrency", response_model=list[ConcurrencyLimiterStatsResponseSchema])
+async def get_concurrency_stats(
+        principal: PrincipalSchema = Depends(get_current_principal),
+        internal_service: InternalService = Depends(get_internal_service)
+):
+    return await internal_service.get_concurrency_stats(principal=principal)
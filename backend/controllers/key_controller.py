@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, Response
+from dependencies import get_key_service
+from schemas.response.key_response_schemas import JwksResponseSchema
+from services.key_service import KeyService
+
+
+router = APIRouter(
+    tags=["Key"]
+)
+
+
+@router.get("/.well-known/jwks.json", response_model=JwksResponseSchema)
+async def get_jwks(
+        response: Response,
+        key_service: KeyService = Depends(get_key_service)
+):
+    return await key_service.get_jwks(response=response)
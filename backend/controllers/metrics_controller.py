@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from dependencies import get_metrics_service
+from services.metrics_service import MetricsService
+
+
+router = APIRouter(
+    tags=["Metrics"]
+)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(metrics_service: MetricsService = Depends(get_metrics_service)):
+    return await metrics_service.get_metrics()
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, Query
-from fastapi.security import HTTPAuthorizationCredentials
+from fastapi import APIRouter, Depends, Query, Header, Response
+from fastapi.responses import StreamingResponse
 from configuration import settings
+from schemas.internal.pagination_schemas import PaginationMode, CountStrategy
 from schemas.request.post_request_schemas import PostRequestSchema
-from schemas.response.post_response_schemas import PostResponseSchema, PostsResponseSchema
+from schemas.response.post_response_schemas import PostResponseSchema, PostsResponseSchema, PostListResponseSchema
+from schemas.internal.list_view_schemas import ListView
 from schemas.response.item_delete_response_schemas import ItemDeleteResponse
-from dependencies import get_post_service
+from dependencies import get_post_service, get_post_read_service, get_current_principal, get_read_principal
+from schemas.internal.principal_schemas import PrincipalSchema
 from services.post_service import PostService
 from uuid import UUID
 
@@ -18,35 +21,84 @@ router = APIRouter(
 @router.post("", response_model=PostResponseSchema)
 async def create(
         payload: PostRequestSchema,
-        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
+        principal: PrincipalSchema = Depends(get_current_principal),
         post_service: PostService = Depends(get_post_service)
 ):
-    return await post_service.create(payload=payload, encoded_jwt=credentials.credentials)
+    return await post_service.create(payload=payload, principal=principal)
 
 
-@router.get("/all", response_model=PostsResponseSchema)
+@router.get("/all", response_model=PostListResponseSchema)
 async def get_all(
+        response: Response,
         page: int = Query(default=1, ge=1, description="Номер страницы"),
         page_size: int = Query(default=5, ge=1, le=100, description="Количество элементов на странице"),
-        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
-        post_service: PostService = Depends(get_post_service)
+        pagination: PaginationMode = Query(default=PaginationMode.offset, description="Режим пагинации"),
+        cursor: str | None = Query(default=None, description="Курсор следующей страницы"),
+        count_strategy: CountStrategy = Query(default=CountStrategy.exact, description="Способ подсчета общего количества"),
+        include_total: bool = Query(default=True, description="Возвращать общее количество"),
+        fields: str | None = Query(default=None, description="Возвращаемые поля через запятую"),
+        view: ListView = Query(default=ListView.full, description="Полный текст или превью"),
+        if_none_match: str | None = Header(default=None),
+        principal: PrincipalSchema = Depends(get_read_principal),
+        post_service: PostService = Depends(get_post_read_service)
+):
+    return await post_service.get_all(
+        principal=principal,
+        page=page,
+        page_size=page_size,
+        mode=pagination,
+        cursor=cursor,
+        count_strategy=count_strategy if include_total else CountStrategy.none,
+        fields=fields,
+        view=view,
+        response=response,
+        if_none_match=if_none_match
+    )
+
+
+@router.get("/search", response_model=PostsResponseSchema)
+async def search(
+        q: str = Query(min_length=1, max_length=256, description="Поисковый запрос"),
+        page_size: int = Query(default=5, ge=1, le=100, description="Количество элементов на странице"),
+        cursor: str | None = Query(default=None, description="Курсор следующей страницы"),
+        principal: PrincipalSchema = Depends(get_read_principal),
+        post_service: PostService = Depends(get_post_read_service)
 ):
-    return await post_service.get_all(encoded_jwt=credentials.credentials, page=page, page_size=page_size)
+    return await post_service.search(principal=principal, query=q, page_size=page_size, cursor=cursor)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export(
+        chunk_size: int = Query(default=settings.export_chunk_size, ge=1, le=10000, description="Размер пачки строк"),
+        principal: PrincipalSchema = Depends(get_read_principal),
+        post_service: PostService = Depends(get_post_read_service)
+):
+    return StreamingResponse(
+        await post_service.export(principal=principal, chunk_size=chunk_size),
+        media_type="application/x-ndjson"
+    )
 
 
 @router.get("", response_model=PostResponseSchema)
 async def get(
         post_id: UUID,
-        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
-        post_service: PostService = Depends(get_post_service)
+        response: Response,
+        if_none_match: str | None = Header(default=None),
+        principal: PrincipalSchema = Depends(get_read_principal),
+        post_service: PostService = Depends(get_post_read_service)
 ):
-    return await post_service.get(post_id=post_id, encoded_jwt=credentials.credentials)
+    return await post_service.get(
+        post_id=post_id,
+        principal=principal,
+        response=response,
+        if_none_match=if_none_match
+    )
 
 
 @router.delete("", response_model=ItemDeleteResponse)
 async def delete(
         post_id: UUID,
-        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
+        principal: PrincipalSchema = Depends(get_current_principal),
         post_service: PostService = Depends(get_post_service)
 ):
-    return await post_service.delete(encoded_jwt=credentials.credentials, post_id=post_id)
+    return await post_service.delete(principal=principal, post_id=post_id)
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, Query
-from fastapi.security import HTTPAuthorizationCredentials
+from schemas.internal.pagination_schemas import PaginationMode, CountStrategy
 from schemas.request.role_request_schemas import RoleRequestSchema, RolePatchRequestSchema
-from dependencies import get_role_service
+from dependencies import get_role_service, get_role_read_service, get_current_principal, get_replica_principal
+from schemas.internal.principal_schemas import PrincipalSchema
 from services.role_service import RoleService
-from configuration import settings
 from schemas.response.role_response_schemas import RoleResponseSchema, RolesResponseSchema
 from uuid import UUID
 
@@ -17,27 +17,38 @@ router = APIRouter(
 @router.post("", response_model=RoleResponseSchema)
 async def create(
         payload: RoleRequestSchema,
-        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
+        principal: PrincipalSchema = Depends(get_current_principal),
         role_service: RoleService = Depends(get_role_service)
 ):
-    return await role_service.create(payload=payload, encoded_jwt=credentials.credentials)
+    return await role_service.create(payload=payload, principal=principal)
 
 
 @router.get("", response_model=RolesResponseSchema)
 async def get_all_roles(
         page: int = Query(1, ge=1, description="Номер страницы"),
         page_size: int = Query(5, ge=1, le=100, description="Количество элементов на странице"),
-        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
-        role_service: RoleService = Depends(get_role_service)
+        pagination: PaginationMode = Query(default=PaginationMode.offset, description="Режим пагинации"),
+        cursor: str | None = Query(default=None, description="Курсор следующей страницы"),
+        count_strategy: CountStrategy = Query(default=CountStrategy.exact, description="Способ подсчета общего количества"),
+        include_total: bool = Query(default=True, description="Возвращать общее количество"),
+        principal: PrincipalSchema = Depends(get_replica_principal),
+        role_service: RoleService = Depends(get_role_read_service)
 ):
-    return await role_service.get_all_roles(encoded_jwt=credentials.credentials, page=page, page_size=page_size)
+    return await role_service.get_all_roles(
+        principal=principal,
+        page=page,
+        page_size=page_size,
+        mode=pagination,
+        cursor=cursor,
+        count_strategy=count_strategy if include_total else CountStrategy.none
+    )
 
 
 @router.patch("", response_model=RoleResponseSchema)
 async def edit_rights(
         role_id: UUID,
         payload: RolePatchRequestSchema,
-        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
+        principal: PrincipalSchema = Depends(get_current_principal),
         role_service: RoleService = Depends(get_role_service)
 ):
-    return await role_service.edit_role(role_id=role_id, payload=payload, encoded_jwt=credentials.credentials)
+    return await role_service.edit_role(role_id=role_id, payload=payload, principal=principal)
@@ -2,9 +2,15 @@ from fastapi import APIRouter
 from controllers.user_controller import router as user_router
 from controllers.role_controller import router as role_router
 from controllers.post_controller import router as post_router
+from controllers.internal_controller import router as internal_router
+from controllers.key_controller import router as key_router
+from controllers.metrics_controller import router as metrics_router
 
 
 router = APIRouter()
 router.include_router(user_router)
 router.include_router(role_router)
 router.include_router(post_router)
+router.include_router(internal_router)
+router.include_router(key_router)
+router.include_router(metrics_router)
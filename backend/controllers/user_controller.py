@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends, Response, Cookie, Query
+from schemas.internal.pagination_schemas import PaginationMode, CountStrategy
 from schemas.request.user_request_schemas import UserRegistrationRequestSchema, UserLoginRequestSchema
 from schemas.request.user_request_schemas import UserPatchRequestSchema, UserChangeRoleRequestSchema
 from schemas.response.user_response_schemas import UserInfoSchema, UserLogoutSchema, UserFullInfoSchema
 from schemas.response.user_response_schemas import UserChangedRoleResponseSchema
-from dependencies import get_user_service
+from dependencies import get_user_service, get_user_read_service, get_current_principal, get_replica_principal
+from schemas.internal.principal_schemas import PrincipalSchema
 from services.user_service import UserService
 from schemas.response.user_response_schemas import UserAuthSchema
-from fastapi.security import HTTPAuthorizationCredentials
-from configuration import settings
 
 
 router = APIRouter(
@@ -37,10 +37,10 @@ async def login(
 @router.patch("/update", response_model=UserInfoSchema)
 async def update(
         payload: UserPatchRequestSchema,
-        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
+        principal: PrincipalSchema = Depends(get_current_principal),
         user_service: UserService = Depends(get_user_service)
 ):
-    return await user_service.update(payload=payload, encoded_jwt=credentials.credentials)
+    return await user_service.update(payload=payload, principal=principal)
 
 
 @router.post("/refresh")
@@ -63,35 +63,48 @@ async def logout(
 @router.patch("/delete")
 async def delete(
         response: Response,
-        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
+        principal: PrincipalSchema = Depends(get_current_principal),
         refresh_token: str | None = Cookie(default=None),
         user_service: UserService = Depends(get_user_service)
 ):
-    return await user_service.delete(encoded_jwt=credentials.credentials, response=response, refresh_token=refresh_token)
+    return await user_service.delete(principal=principal, response=response, refresh_token=refresh_token)
 
 
 @router.get("/profile")
 async def get_profile(
-        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
-        user_service: UserService = Depends(get_user_service)
+        principal: PrincipalSchema = Depends(get_replica_principal),
+        user_service: UserService = Depends(get_user_read_service)
 ) -> UserFullInfoSchema:
-    return await user_service.get_profile(encoded_jwt=credentials.credentials)
+    return await user_service.get_profile(principal=principal)
 
 
 @router.get("/all")
 async def get_all(
         page: int = Query(default=1, ge=1, description="Номер страницы"),
         page_size: int = Query(default=5, ge=1, le=100, description="Количество элементов на странице"),
-        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
-        user_service: UserService = Depends(get_user_service)
+        pagination: PaginationMode = Query(default=PaginationMode.offset, description="Режим пагинации"),
+        cursor: str | None = Query(default=None, description="Курсор следующей страницы"),
+        count_strategy: CountStrategy = Query(default=CountStrategy.exact, description="Способ подсчета общего количества"),
+        include_total: bool = Query(default=True, description="Возвращать общее количество"),
+        fields: str | None = Query(default=None, description="Возвращаемые поля через запятую"),
+        principal: PrincipalSchema = Depends(get_replica_principal),
+        user_service: UserService = Depends(get_user_read_service)
 ):
-    return await user_service.get_all(encoded_jwt=credentials.credentials, page=page, page_size=page_size)
+    return await user_service.get_all(
+        principal=principal,
+        page=page,
+        page_size=page_size,
+        mode=pagination,
+        cursor=cursor,
+        count_strategy=count_strategy if include_total else CountStrategy.none,
+        fields=fields
+    )
 
 
 @router.patch("/change-role", response_model=UserChangedRoleResponseSchema)
 async def change_role(
         payload: UserChangeRoleRequestSchema,
-        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
+        principal: PrincipalSchema = Depends(get_current_principal),
         user_service: UserService = Depends(get_user_service)
 ):
-    return await user_service.change_role(payload=payload, encoded_jwt=credentials.credentials)
+    return await user_service.change_role(payload=payload, principal=principal)
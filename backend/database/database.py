@@ -1,19 +1,134 @@
+import time
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
-import os
-from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import declarative_base, Session
+from uuid import UUID, uuid4
+from typing import Callable
+from configuration import settings
+from database.pool import MonitoredQueuePool
+from database.replicas import Replica, ReplicaRouter, RecentWriters
+from utils.metrics import observe_query
+from utils.cache import cache
 
-load_dotenv()
-engine = create_async_engine(os.getenv("DATABASE_URL"), echo=False)
+
+def get_connect_args(database_url: str) -> dict:
+    if make_url(database_url).get_driver_name() != "asyncpg":
+        return {}
+    if settings.db_pgbouncer_mode:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__"
+        }
+    return {"prepared_statement_cache_size": settings.db_statement_cache_size}
+
+
+def create_engine(database_url: str):
+    return create_async_engine(
+        database_url,
+        echo=settings.db_echo,
+        poolclass=MonitoredQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=get_connect_args(database_url)
+    )
+
+
+class PrimarySession(Session):
+    pass
+
+
+engine = create_engine(settings.database_url)
 async_session = async_sessionmaker(
     engine,
     expire_on_commit=False,
     class_=AsyncSession,
+    sync_session_class=PrimarySession,
     autoflush=False
 )
+replica_engines = [create_engine(url) for url in settings.database_replica_urls]
+replica_router = ReplicaRouter(
+    replicas=[
+        Replica(
+            engine=replica_engine,
+            session_factory=async_sessionmaker(
+                replica_engine,
+                expire_on_commit=False,
+                class_=AsyncSession,
+                autoflush=False
+            )
+        )
+        for replica_engine in replica_engines
+    ],
+    max_lag=settings.replica_max_lag,
+    check_interval=settings.replica_lag_check_interval
+)
+recent_writers = RecentWriters(
+    window=settings.read_your_writes_window,
+    max_size=settings.read_your_writes_max_users,
+    cache=cache
+)
 Base = declarative_base()
 
 
+def on_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    session.info.setdefault("after_commit_callbacks", []).append(callback)
+
+
+@event.listens_for(PrimarySession, "do_orm_execute")
+def track_writes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(PrimarySession, "after_commit")
+def run_after_commit(session: Session):
+    if not session.info.pop("has_writes", False):
+        return
+    user_id = session.info.get("user_id")
+    if user_id is not None:
+        recent_writers.mark(user_id=user_id)
+    for callback in session.info.pop("after_commit_callbacks", []):
+        callback()
+
+
+@event.listens_for(PrimarySession, "after_rollback")
+def discard_after_commit(session: Session):
+    session.info.pop("has_writes", None)
+    session.info.pop("after_commit_callbacks", None)
+
+
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    observe_query(duration=time.perf_counter() - conn.info["query_started_at"].pop())
+
+
+def discard_query_timer(exception_context):
+    if exception_context.connection is not None and exception_context.connection.info.get("query_started_at"):
+        observe_query(duration=time.perf_counter() - exception_context.connection.info["query_started_at"].pop())
+
+
+for timed_engine in (engine, *replica_engines):
+    event.listen(timed_engine.sync_engine, "before_cursor_execute", start_query_timer)
+    event.listen(timed_engine.sync_engine, "after_cursor_execute", stop_query_timer)
+    event.listen(timed_engine.sync_engine, "handle_error", discard_query_timer)
+
+
+async def get_read_session_factory(user_id: UUID | None = None, issued_at: int | None = None) -> async_sessionmaker:
+    if await recent_writers.is_recent(user_id=user_id):
+        return async_session
+    if issued_at is not None and issued_at + settings.read_your_writes_window > time.time():
+        return async_session
+    return replica_router.choose() or async_session
+
+
 async def get_db():
     async with async_session() as session:
         yield session
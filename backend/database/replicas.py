@@ -0,0 +1,90 @@
+import asyncio
+import time
+from collections import OrderedDict
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from utils.cache import ReadThroughCache
+
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine, session_factory: async_sessionmaker):
+        self.engine = engine
+        self.session_factory = session_factory
+        self.lag: float | None = None
+
+
+class ReplicaRouter:
+    def __init__(self, replicas: list[Replica], max_lag: float, check_interval: float):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._turn = 0
+
+    def choose(self) -> async_sessionmaker | None:
+        healthy = [replica for replica in self.replicas if replica.lag is not None and replica.lag <= self.max_lag]
+        if not healthy:
+            return None
+        # Every replica under the lag threshold takes its share of reads in turn
+        self._turn = (self._turn + 1) % len(healthy)
+        return healthy[self._turn].session_factory
+
+    async def check(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as connection:
+                replica.lag = float((await connection.execute(REPLICA_LAG_QUERY)).scalar_one())
+        except Exception:
+            replica.lag = None
+
+    async def monitor(self) -> None:
+        while True:
+            await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+            await asyncio.sleep(self.check_interval)
+
+
+class RecentWriters:
+    # Marks are kept in this process and, with a shared cache backend, under a short-lived key for the other
+    # workers. With a per-process backend a read served by another worker only has the token age to go by.
+    def __init__(self, window: float, max_size: int, cache: ReadThroughCache):
+        self.window = window
+        self.max_size = max_size
+        self.cache = cache
+        self._writers: OrderedDict[UUID, float] = OrderedDict()
+
+    def mark(self, user_id: UUID) -> None:
+        self._writers[user_id] = time.monotonic() + self.window
+        self._writers.move_to_end(user_id)
+        self._sweep()
+        if self.cache.backend.shared:
+            self.cache.run_later(operation=self.cache.backend.set(self.key(user_id=user_id), "1", ttl=self.window))
+
+    async def is_recent(self, user_id: UUID | None) -> bool:
+        if user_id is None:
+            return False
+        self._sweep()
+        if user_id in self._writers:
+            return True
+        if self.cache.backend.shared:
+            return await self.cache.backend.get(self.key(user_id=user_id)) is not None
+        return False
+
+    def __len__(self) -> int:
+        return len(self._writers)
+
+    def _sweep(self) -> None:
+        # Every mark lasts the same window and moves to the end, so the oldest entries expire first
+        now = time.monotonic()
+        while self._writers and (len(self._writers) > self.max_size or next(iter(self._writers.values())) <= now):
+            self._writers.popitem(last=False)
+
+    @staticmethod
+    def key(user_id: UUID) -> str:
+        return f"recent-writer:{user_id}"
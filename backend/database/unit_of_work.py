@@ -0,0 +1,17 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class UnitOfWork:
+    def __init__(self, session: AsyncSession):
+        self.session: AsyncSession = session
+
+    @property
+    def has_writes(self) -> bool:
+        return self.session.info.get("has_writes", False)
+
+    async def commit(self) -> None:
+        if self.has_writes:
+            await self.session.commit()
+
+    async def rollback(self) -> None:
+        await self.session.rollback()
@@ -1,18 +1,133 @@
-from fastapi import Depends
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from database.database import get_db
+from jwt import ExpiredSignatureError, InvalidTokenError
+from configuration import settings
+from uuid import UUID
+from database.database import get_db, get_read_session_factory
+from database.unit_of_work import UnitOfWork
+from repository.user_repository import UserRepository
+from schemas.internal.principal_schemas import PrincipalSchema
+from schemas.internal.role_rights_schemas import RoleRightsSchema
 from services.user_service import UserService
 from services.role_service import RoleService
 from services.post_service import PostService
+from services.internal_service import InternalService
+from services.key_service import KeyService
+from services.metrics_service import MetricsService
+from utils.jwt_utils import decode_jwt, decode_jwt_claims
+from utils.permissions import principal_from_claims
 
 
-async def get_user_service(db: AsyncSession = Depends(get_db)):
+async def get_read_db(credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer)):
+    try:
+        claims = decode_jwt_claims(token=credentials.credentials)
+        session_factory = await get_read_session_factory(user_id=UUID(claims["sub"]), issued_at=claims.get("iat"))
+    except (HTTPException, InvalidTokenError):
+        session_factory = await get_read_session_factory()
+    async with session_factory() as session:
+        yield session
+
+
+async def get_unit_of_work(db: AsyncSession = Depends(get_db)):
+    unit_of_work = UnitOfWork(session=db)
+    try:
+        yield unit_of_work
+    except Exception:
+        await unit_of_work.rollback()
+        raise
+    await unit_of_work.commit()
+
+
+async def get_user_service(unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")):
+    return UserService(db=unit_of_work.session)
+
+
+async def get_role_service(unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")):
+    return RoleService(db=unit_of_work.session)
+
+
+async def get_post_service(unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")):
+    return PostService(db=unit_of_work.session)
+
+
+async def get_user_read_service(db: AsyncSession = Depends(get_read_db)):
     return UserService(db=db)
 
 
-async def get_role_service(db: AsyncSession = Depends(get_db)):
+async def get_role_read_service(db: AsyncSession = Depends(get_read_db)):
     return RoleService(db=db)
 
 
-async def get_post_service(db: AsyncSession = Depends(get_db)):
+async def get_post_read_service(db: AsyncSession = Depends(get_read_db)):
     return PostService(db=db)
+
+
+async def get_internal_service():
+    return InternalService()
+
+
+async def get_key_service():
+    return KeyService()
+
+
+async def get_metrics_service():
+    return MetricsService()
+
+
+async def get_current_principal(
+        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
+        db: AsyncSession = Depends(get_db)
+) -> PrincipalSchema:
+    try:
+        user_id = decode_jwt(token=credentials.credentials)
+    except ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Токен истек"
+        )
+    user = await UserRepository(db=db).get_with_role(id=user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Пользователь не найден"
+        )
+    # The identity map is weak-referencing: keep the user alive so get_by_id in this request reuses it
+    db.info["principal_user"] = user
+    db.info["user_id"] = user.id
+    role = user.role
+    return PrincipalSchema(
+        user_id=user.id,
+        role_id=user.role_id,
+        role_rights=RoleRightsSchema(
+            read_posts_access=bool(role and role.read_posts_access),
+            write_posts_access=bool(role and role.write_posts_access),
+            delete_posts_access=bool(role and role.delete_posts_access),
+            manage_roles_access=bool(role and role.manage_roles_access)
+        )
+    )
+
+
+async def get_replica_principal(
+        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
+        db: AsyncSession = Depends(get_read_db)
+) -> PrincipalSchema:
+    return await get_current_principal(credentials=credentials, db=db)
+
+
+async def get_read_principal(
+        credentials: HTTPAuthorizationCredentials = Depends(settings.http_bearer),
+        db: AsyncSession = Depends(get_read_db)
+) -> PrincipalSchema:
+    if settings.stateless_authorization:
+        try:
+            claims = decode_jwt_claims(token=credentials.credentials)
+        except ExpiredSignatureError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Токен истек"
+            )
+        principal = await principal_from_claims(claims=claims)
+        if principal is not None:
+            return principal
+    return await get_current_principal(credentials=credentials, db=db)
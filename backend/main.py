@@ -1,10 +1,80 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from database.database import engine, Base
+from database.database import engine, Base, replica_router
 from fastapi.middleware.cors import CORSMiddleware
 from controllers.routers import router
+from utils.hasher import hash_pool
+from utils.jwt_utils import reload_keys
+from utils.cache import cache
+from utils.role_cache import role_cache
+from utils.single_flight import single_flights
+from utils.metrics import stats_collector
+from middleware.rate_limit import RateLimitMiddleware, create_rate_limit_backend
+from middleware.concurrency_limit import ConcurrencyLimitMiddleware, concurrency_limiters
+from middleware.metrics import MetricsMiddleware
+from configuration import settings
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    reload_keys()
+    if not cache.backend.shared and settings.web_concurrency > 1:
+        logger.warning(
+            "The %s cache backend is per process: with %d workers, invalidations do not reach other workers "
+            "and they serve stale entries for up to cache_ttl + cache_stale_ttl seconds. Use cache_backend=redis.",
+            settings.cache_backend,
+            settings.web_concurrency
+        )
+    if settings.stateless_authorization and not cache.backend.shared:
+        logger.warning(
+            "stateless_authorization needs a shared cache backend for permission versions, "
+            "the %s backend is per process: permission claims are ignored",
+            settings.cache_backend
+        )
+    replica_monitor =asyncio.create_task(replica_router.monitor()) if replica_router.replicas else None
+    cache_listener = asyncio.create_task(cache.listen())
+    yield
+    if replica_monitor is not None:
+        replica_monitor.cancel()
+    cache_listener.cancel()
+    await cache.close()
+    hash_pool.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(router)
+if settings.concurrency_limit_enabled:
+    app.add_middleware(
+        ConcurrencyLimitMiddleware,
+        limiters=concurrency_limiters,
+        retry_after=settings.concurrency_retry_after
+    )
+if settings.rate_limit_enabled:
+    app.add_middleware(
+        RateLimitMiddleware,
+        backend=create_rate_limit_backend(kind=settings.rate_limit_backend),
+        user_rules=settings.rate_limit_user_rules,
+        ip_rules=settings.rate_limit_ip_rules,
+        trust_forwarded=settings.rate_limit_trust_forwarded
+    )
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, routes=app.routes)
+    stats_collector.add_source(name="role_cache", source=role_cache.stats)
+    stats_collector.add_source(name="hash_pool", source=hash_pool.stats)
+    stats_collector.add_source(name="db_pool", source=engine.pool.stats)
+    stats_collector.add_source(name="response_cache", source=cache.stats)
+    stats_collector.add_source(
+        name="single_flight",
+        source=lambda: [flight.stats() for flight in single_flights.values()]
+    )
+    stats_collector.add_source(
+        name="concurrency_limiter",
+        source=lambda: [limiter.stats() for limiter in concurrency_limiters.values()]
+    )
 origins = ["*"]
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,159 @@
+import asyncio
+import time
+from collections import deque
+from fastapi import status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from configuration import settings
+
+
+class Overloaded(Exception):
+    pass
+
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(
+            self,
+            name: str,
+            initial_limit: float,
+            min_limit: float,
+            max_limit: float,
+            latency_target: float,
+            backoff_ratio: float,
+            max_queue_size: int,
+            max_queue_wait: float
+    ):
+        self.name = name
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff_ratio = backoff_ratio
+        self.max_queue_size = max_queue_size
+        self.max_queue_wait = max_queue_wait
+        self.in_flight = 0
+        self.accepted = 0
+        self.shed = 0
+        self.queued = 0
+        self.total_queue_wait = 0.0
+        self.max_observed_queue_wait = 0.0
+        self._last_decrease = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            self.accepted += 1
+            return
+        if len(self._waiters) >= self.max_queue_size:
+            self.shed += 1
+            raise Overloaded()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_queue_wait)
+        except BaseException as error:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended: give it back before leaving
+                self.in_flight -= 1
+                self._wake()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(error, asyncio.TimeoutError):
+                self.shed += 1
+                raise Overloaded()
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.total_queue_wait += waited
+            self.max_observed_queue_wait = max(self.max_observed_queue_wait, waited)
+        self.accepted += 1
+
+    def release(self, latency: float) -> None:
+        self.in_flight -= 1
+        now = time.monotonic()
+        if latency > self.latency_target:
+            if now - self._last_decrease >= self.latency_target:
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self._last_decrease = now
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._wake()
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "accepted": self.accepted,
+            "shed": self.shed,
+            "queued": self.queued,
+            "average_queue_wait_ms": self.total_queue_wait / self.queued * 1000 if self.queued else 0.0,
+            "max_queue_wait_ms": self.max_observed_queue_wait * 1000
+        }
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+concurrency_limiters: dict[str, AdaptiveConcurrencyLimiter] = {
+    name: AdaptiveConcurrencyLimiter(
+        name=name,
+        initial_limit=limits["initial_limit"],
+        min_limit=limits["min_limit"],
+        max_limit=limits["max_limit"],
+        latency_target=limits["latency_target"],
+        backoff_ratio=settings.concurrency_backoff_ratio,
+        max_queue_size=settings.concurrency_max_queue_size,
+        max_queue_wait=settings.concurrency_max_queue_wait
+    )
+    for name, limits in settings.concurrency_limits.items()
+}
+
+
+def route_class(method: str, path: str) -> str:
+    route = f"{method} {path}"
+    if route in settings.concurrency_route_classes:
+        return settings.concurrency_route_classes[route]
+    return "read" if method in ("GET", "HEAD") else "write"
+
+
+class ConcurrencyLimitMiddleware:
+    def __init__(self, app: ASGIApp, limiters: dict[str, AdaptiveConcurrencyLimiter], retry_after: int):
+        self.app = app
+        self.limiters = limiters
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limiter = None
+        if scope["type"] == "http":
+            limiter = self.limiters.get(route_class(method=scope["method"], path=scope["path"]))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except Overloaded:
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Сервер перегружен, повторите попытку позже"},
+                headers={"Retry-After": str(self.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(latency=time.perf_counter() - started)
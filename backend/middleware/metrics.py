@@ -0,0 +1,52 @@
+import time
+from fastapi.routing import RouteContext, iter_route_contexts
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils.metrics import REQUEST_DB_DURATION, REQUEST_DB_QUERIES, REQUEST_DURATION, REQUESTS_IN_FLIGHT
+from utils.metrics import RequestCost, request_cost
+
+
+def route_template(routes: list[RouteContext], scope: Scope) -> str:
+    # Route templates keep the label set bounded, unmatched paths share one label
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path_format or "unmatched"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, routes: list[BaseRoute]):
+        self.app = app
+        self.routes = list(iter_route_contexts(routes))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(routes=self.routes, scope=scope)
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        cost = RequestCost()
+        token = request_cost.set(cost)
+        in_flight = REQUESTS_IN_FLIGHT.labels(method=method, route=route)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_DURATION.labels(method=method, route=route, status=str(status_code)).observe(
+                time.perf_counter() - started
+            )
+            in_flight.dec()
+            REQUEST_DB_QUERIES.labels(method=method, route=route).observe(cost.queries)
+            REQUEST_DB_DURATION.labels(method=method, route=route).observe(cost.duration)
+            request_cost.reset(token)
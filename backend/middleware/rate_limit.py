@@ -0,0 +1,158 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from fastapi import HTTPException, status
+from jwt import InvalidTokenError
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from configuration import settings
+from utils.jwt_utils import decode_jwt_claims
+
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / refill_rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill_rate * 1000))
+return tostring(retry_after)
+"""
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def take(self, key: str, capacity: int, refill_rate: float) -> float:
+        ...
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, capacity: int, refill_rate: float) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / refill_rate
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as error:
+            raise RuntimeError("The redis rate limit backend requires the redis package") from error
+        self.client = redis.from_url(url)
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, capacity: int, refill_rate: float) -> float:
+        return float(await self.script(keys=[key], args=[capacity, refill_rate]))
+
+
+def create_rate_limit_backend(kind: str) -> RateLimitBackend:
+    if kind == "memory":
+        return MemoryRateLimitBackend(max_keys=settings.rate_limit_max_keys)
+    if kind == "redis":
+        return RedisRateLimitBackend(url=settings.rate_limit_redis_url)
+    raise ValueError(f"Unknown rate limit backend: {kind}")
+
+
+def parse_rules(rules: dict[str, str]) -> dict[str, tuple[int, float]]:
+    parsed = {}
+    for route, rule in rules.items():
+        capacity, period = rule.split("/")
+        parsed[route] = (int(capacity), int(capacity) / float(period))
+    return parsed
+
+
+class RateLimitMiddleware:
+    def __init__(
+            self,
+            app: ASGIApp,
+            backend: RateLimitBackend,
+            user_rules: dict[str, str],
+            ip_rules: dict[str, str],
+            trust_forwarded: bool = False
+    ):
+        self.app = app
+        self.backend = backend
+        self.user_rules = parse_rules(rules=user_rules)
+        self.ip_rules = parse_rules(rules=ip_rules)
+        self.trust_forwarded = trust_forwarded
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = f"{scope['method']} {scope['path']}"
+        headers = dict(scope["headers"])
+        retry_after = await self.take(
+            rules=self.ip_rules,
+            route=route,
+            subject=f"ip:{self.client_ip(scope=scope, headers=headers)}"
+        )
+        user_id = self.user_id(headers=headers)
+        if user_id is not None:
+            retry_after = max(
+                retry_after,
+                await self.take(rules=self.user_rules, route=route, subject=f"user:{user_id}")
+            )
+
+        if retry_after > 0:
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Слишком много запросов, повторите попытку позже"},
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    async def take(self, rules: dict[str, tuple[int, float]], route: str, subject: str) -> float:
+        rule_name = route if route in rules else "*"
+        rule = rules.get(rule_name)
+        if rule is None:
+            return 0.0
+        capacity, refill_rate = rule
+        return await self.backend.take(
+            key=f"rate_limit:{subject}:{rule_name}",
+            capacity=capacity,
+            refill_rate=refill_rate
+        )
+
+    def client_ip(self, scope: Scope, headers: dict[bytes, bytes]) -> str:
+        if self.trust_forwarded and b"x-forwarded-for" in headers:
+            return headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    def user_id(headers: dict[bytes, bytes]) -> str | None:
+        scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            return decode_jwt_claims(token=token)["sub"]
+        except (HTTPException, InvalidTokenError, KeyError):
+            return None
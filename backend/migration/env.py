@@ -9,6 +9,7 @@ from database.database import Base
 from models.user import User
 from models.role import Role
 from models.post import Post
+from models.row_counter import RowCounter
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
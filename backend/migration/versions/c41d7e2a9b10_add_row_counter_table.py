@@ -0,0 +1,86 @@
+"""add row_counter table
+
+Revision ID: c41d7e2a9b10
+Revises: 7f0341119b61
+Create Date: 2026-10-18 10:12:31.514208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e2a9b10'
+down_revision: Union[str, Sequence[str], None] = '7f0341119b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+counted_tables = ("post", "user", "role")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('row_counter',
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('row_count', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.execute("""
+        CREATE FUNCTION row_counter_insert() RETURNS trigger AS $$
+        BEGIN
+            UPDATE row_counter SET row_count = row_count + (SELECT count(*) FROM new_rows)
+            WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION row_counter_delete() RETURNS trigger AS $$
+        BEGIN
+            UPDATE row_counter SET row_count = row_count - (SELECT count(*) FROM old_rows)
+            WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION row_counter_truncate() RETURNS trigger AS $$
+        BEGIN
+            UPDATE row_counter SET row_count = 0 WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for table_name in counted_tables:
+        op.execute(f"""
+            CREATE TRIGGER {table_name}_row_counter_insert AFTER INSERT ON "{table_name}"
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION row_counter_insert()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table_name}_row_counter_delete AFTER DELETE ON "{table_name}"
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION row_counter_delete()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table_name}_row_counter_truncate AFTER TRUNCATE ON "{table_name}"
+            FOR EACH STATEMENT EXECUTE FUNCTION row_counter_truncate()
+        """)
+        op.execute(f"""
+            INSERT INTO row_counter (table_name, row_count)
+            SELECT '{table_name}', count(*) FROM "{table_name}"
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name in counted_tables:
+        op.execute(f'DROP TRIGGER {table_name}_row_counter_truncate ON "{table_name}"')
+        op.execute(f'DROP TRIGGER {table_name}_row_counter_delete ON "{table_name}"')
+        op.execute(f'DROP TRIGGER {table_name}_row_counter_insert ON "{table_name}"')
+    op.execute("DROP FUNCTION row_counter_truncate()")
+    op.execute("DROP FUNCTION row_counter_delete()")
+    op.execute("DROP FUNCTION row_counter_insert()")
+    op.drop_table('row_counter')
@@ -0,0 +1,112 @@
+"""add change versions
+
+Revision ID: f3c9a1e7d240
+Revises: e8b2d94f6a15
+Create Date: 2026-10-18 15:41:07.284519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9a1e7d240'
+down_revision: Union[str, Sequence[str], None] = 'e8b2d94f6a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('row_counter', sa.Column('version', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('post', sa.Column('version', sa.BigInteger(), server_default='1', nullable=False))
+    op.execute("""
+        CREATE OR REPLACE FUNCTION row_counter_insert() RETURNS trigger AS $$
+        BEGIN
+            UPDATE row_counter SET row_count = row_count + (SELECT count(*) FROM new_rows), version = version + 1
+            WHERE table_name = TG_TABLE_NAME AND EXISTS (SELECT 1 FROM new_rows);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION row_counter_delete() RETURNS trigger AS $$
+        BEGIN
+            UPDATE row_counter SET row_count = row_count - (SELECT count(*) FROM old_rows), version = version + 1
+            WHERE table_name = TG_TABLE_NAME AND EXISTS (SELECT 1 FROM old_rows);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION row_counter_truncate() RETURNS trigger AS $$
+        BEGIN
+            UPDATE row_counter SET row_count = 0, version = version + 1 WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION row_counter_update() RETURNS trigger AS $$
+        BEGIN
+            UPDATE row_counter SET version = version + 1
+            WHERE table_name = TG_TABLE_NAME AND EXISTS (SELECT 1 FROM new_rows);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER post_row_counter_update AFTER UPDATE ON post
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION row_counter_update()
+    """)
+    op.execute("""
+        CREATE FUNCTION post_version_bump() RETURNS trigger AS $$
+        BEGIN
+            NEW.version = OLD.version + 1;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER post_version_bump BEFORE UPDATE ON post
+        FOR EACH ROW EXECUTE FUNCTION post_version_bump()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER post_version_bump ON post")
+    op.execute("DROP FUNCTION post_version_bump()")
+    op.execute("DROP TRIGGER post_row_counter_update ON post")
+    op.execute("DROP FUNCTION row_counter_update()")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION row_counter_insert() RETURNS trigger AS $$
+        BEGIN
+            UPDATE row_counter SET row_count = row_count + (SELECT count(*) FROM new_rows)
+            WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION row_counter_delete() RETURNS trigger AS $$
+        BEGIN
+            UPDATE row_counter SET row_count = row_count - (SELECT count(*) FROM old_rows)
+            WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION row_counter_truncate() RETURNS trigger AS $$
+        BEGIN
+            UPDATE row_counter SET row_count = 0 WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.drop_column('post', 'version')
+    op.drop_column('row_counter', 'version')
@@ -1,3 +1,4 @@
 from .post import Post
 from .role import Role
 from .user import User
+from .row_counter import RowCounter
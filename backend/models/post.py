@@ -1,7 +1,7 @@
 from database.database import Base
-from sqlalchemy import func, Column, String, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import func, Column, String, ForeignKey, Computed, Index, BigInteger
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 
 
 class Post(Base):
@@ -11,5 +11,18 @@ class Post(Base):
     title = Column(String)
     text = Column(String)
     author_id = Column(UUID(as_uuid=True), ForeignKey("user.id"))
+    version = Column(BigInteger, nullable=False, server_default="1")
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(text, '')), 'B')",
+            persisted=True
+        )
+    ))
 
     author = relationship("User", back_populates="posts")
+
+    __table_args__ = (
+        Index("ix_post_search_vector", "search_vector", postgresql_using="gin"),
+    )
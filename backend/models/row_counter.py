@@ -0,0 +1,10 @@
+from database.database import Base
+from sqlalchemy import Column, String, BigInteger
+
+
+class RowCounter(Base):
+    __tablename__ = "row_counter"
+    table_name = Column(String, primary_key=True)
+
+    row_count = Column(BigInteger, nullable=False, default=0)
+    version = Column(BigInteger, nullable=False, server_default="0")
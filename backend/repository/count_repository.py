@@ -0,0 +1,64 @@
+import time
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, text
+from configuration import settings
+from models.row_counter import RowCounter
+from schemas.internal.pagination_schemas import CountStrategy
+
+cached_counts: dict[str, tuple[float, int]] = {}
+
+
+class CountRepository:
+    def __init__(self, db: AsyncSession):
+        self.db: AsyncSession = db
+
+    async def count(self, model, strategy: CountStrategy) -> tuple[int | None, CountStrategy]:
+        if strategy == CountStrategy.none:
+            return None, strategy
+        if strategy == CountStrategy.estimate:
+            estimate = await self.estimate(model=model)
+            if estimate is not None:
+                return estimate, strategy
+        if strategy == CountStrategy.cached:
+            return await self.cached(model=model), strategy
+        if strategy == CountStrategy.counter:
+            row_count = await self.counter(model=model)
+            if row_count is not None:
+                return row_count, strategy
+        return await self.exact(model=model), CountStrategy.exact
+
+    async def exact(self, model) -> int:
+        result = await self.db.execute(select(func.count()).select_from(model))
+        return result.scalar_one()
+
+    async def estimate(self, model) -> int | None:
+        result = await self.db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+            {"table_name": f'"{model.__tablename__}"'}
+        )
+        estimate = result.scalar_one_or_none()
+        if estimate is None or estimate < 0:
+            return None
+        return estimate
+
+    async def cached(self, model) -> int:
+        entry = cached_counts.get(model.__tablename__)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        total_count = await self.exact(model=model)
+        cached_counts[model.__tablename__] = (time.monotonic() + settings.count_cache_ttl, total_count)
+        return total_count
+
+    async def counter(self, model) -> int | None:
+        result = await self.db.execute(
+            select(RowCounter.row_count)
+            .where(RowCounter.table_name == model.__tablename__)
+        )
+        return result.scalar_one_or_none()
+
+    async def version(self, model) -> int:
+        result = await self.db.execute(
+            select(RowCounter.version)
+            .where(RowCounter.table_name == model.__tablename__)
+        )
+        return result.scalar_one_or_none() or 0
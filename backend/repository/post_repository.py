@@ -1,36 +1,97 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from models.post import Post
 from uuid import UUID
-from sqlalchemy import select, func, delete
+from repository.count_repository import CountRepository
+from schemas.internal.pagination_schemas import CountStrategy
+from sqlalchemy import select, delete, insert, func, or_, and_
+from database.database import on_commit
+from utils.cache import cache
 
 
 class PostRepository:
     def __init__(self, db: AsyncSession):
         self.db: AsyncSession = db
+        self.count_repository: CountRepository = CountRepository(db=db)
 
     async def post(self, title: str, text: str, author_id: UUID) -> Post:
-        post = Post(
-            title=title,
-            text=text,
-            author_id=author_id
+        result = await self.db.execute(
+            insert(Post)
+            .values(
+                title=title,
+                text=text,
+                author_id=author_id
+            )
+            .returning(Post)
         )
-        self.db.add(post)
-        await self.db.commit()
-        await self.db.refresh(post)
+        post = result.scalar_one()
         return post
 
-    async def get_all(self, page: int, page_size: int):
+    def select_fields(self, fields: list[str], preview_length: int):
+        columns = []
+        for field in fields:
+            if field == "preview":
+                columns.append(func.left(Post.text, preview_length).label("preview"))
+            else:
+                columns.append(getattr(Post, field))
+        return select(*columns)
+
+    async def get_all(self, page: int, page_size: int, fields: list[str], preview_length: int):
         offset = (page - 1) * page_size
         result = await self.db.execute(
-            select(Post)
+            self.select_fields(fields=fields, preview_length=preview_length)
+            .order_by(Post.id)
             .offset(offset)
             .limit(page_size)
         )
 
-        roles = result.scalars().all()
-        count_result = await self.db.execute(select(func.count(Post.id)))
-        total_count = count_result.scalar_one()
-        return roles, total_count
+        posts = result.mappings().all()
+        return posts
+
+    async def count(self, strategy: CountStrategy) -> tuple[int | None, CountStrategy]:
+        return await self.count_repository.count(model=Post, strategy=strategy)
+
+    async def collection_version(self) -> int:
+        return await self.count_repository.version(model=Post)
+
+    async def get_after(self, after_id: UUID | None, limit: int, fields: list[str], preview_length: int):
+        query = (
+            self.select_fields(fields=fields, preview_length=preview_length)
+            .order_by(Post.id)
+            .limit(limit)
+        )
+        if after_id is not None:
+            query = query.where(Post.id > after_id)
+        result = await self.db.execute(query)
+        return result.mappings().all()
+
+    async def search(self, query: str, after: tuple[float, UUID] | None, limit: int):
+        ts_query = func.websearch_to_tsquery("russian", query)
+        rank = func.ts_rank_cd(Post.search_vector, ts_query)
+        statement = (
+            select(Post, rank.label("rank"))
+            .where(Post.search_vector.bool_op("@@")(ts_query))
+            .order_by(rank.desc(), Post.id)
+            .limit(limit)
+        )
+        if after is not None:
+            after_rank, after_id = after
+            statement = statement.where(
+                or_(
+                    rank < after_rank,
+                    and_(rank == after_rank, Post.id > after_id)
+                )
+            )
+        result = await self.db.execute(statement)
+        return result.all()
+
+    async def stream_all(self, chunk_size: int):
+        result = await self.db.stream_scalars(
+            select(Post)
+            .order_by(Post.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for posts in result.partitions():
+            yield posts
 
     async def get_by_id(self, post_id: UUID) -> Post:
         result = await self.db.execute(
@@ -47,5 +108,6 @@ class PostRepository:
             .where(Post.id == post_id)
         )
 
-        await self.db.commit()
+        if result.rowcount:
+            on_commit(session=self.db, callback=lambda: cache.invalidate_later(keys=[f"post:{post_id}"]))
         return result.rowcount
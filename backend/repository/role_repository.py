@@ -1,13 +1,21 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from sqlalchemy import select, func
+from repository.count_repository import CountRepository
+from schemas.internal.pagination_schemas import CountStrategy
+from sqlalchemy import select, insert, update
 from models.role import Role
+from models.user import User
 from typing import Optional
+from utils.role_cache import role_cache
+from utils.cache import cache
+from utils.permissions import permission_versions
+from database.database import on_commit
 
 
 class RoleRepository:
     def __init__(self, db: AsyncSession):
         self.db: AsyncSession = db
+        self.count_repository: CountRepository = CountRepository(db=db)
 
     async def post(
             self,
@@ -17,62 +25,125 @@ class RoleRepository:
             delete_posts_access: Optional[bool] = False,
             manage_roles_access: Optional[bool] = False
     ) -> Role:
-        role = Role(
-            name=role_name,
-            read_posts_access=read_posts_access,
-            write_posts_access=write_posts_access,
-            delete_posts_access=delete_posts_access,
-            manage_roles_access=manage_roles_access
+        result = await self.db.execute(
+            insert(Role)
+            .values(
+                name=role_name,
+                read_posts_access=read_posts_access,
+                write_posts_access=write_posts_access,
+                delete_posts_access=delete_posts_access,
+                manage_roles_access=manage_roles_access
+            )
+            .returning(Role)
         )
-        self.db.add(role)
-
-        await self.db.commit()
-        await self.db.refresh(role)
+        role = result.scalar_one()
+        on_commit(session=self.db, callback=lambda: self._after_post(role_id=role.id, name=role.name))
         return role
 
     async def get_by_id(self, id: UUID) -> Role | None:
+        cached_role = role_cache.get_by_id(role_id=id)
+        if cached_role is None:
+            values = await cache.get_or_load(key=f"role:{id}", loader=lambda: self.load_values(id=id))
+            if values is None:
+                return None
+            cached_role = role_cache.put(role=Role(**{**values, "id": UUID(values["id"])}))
+        return await self.db.merge(cached_role, load=False)
+
+    async def load_values(self, id: UUID) -> dict | None:
         result = await self.db.execute(select(Role).where(Role.id == id))
         role = result.scalar_one_or_none()
-        return role
+        if role is None:
+            return None
+        return {
+            "id": str(role.id),
+            "name": role.name,
+            "read_posts_access": role.read_posts_access,
+            "write_posts_access": role.write_posts_access,
+            "delete_posts_access": role.delete_posts_access,
+            "manage_roles_access": role.manage_roles_access
+        }
+
+    async def get_by_user_id(self, user_id: UUID) -> Role | None:
+        # Reads past the role caches, for callers that must not act on a stale copy
+        result = await self.db.execute(
+            select(Role)
+            .join(User, User.role_id == Role.id)
+            .where(User.id == user_id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
 
     async def get_by_name(self, name: str) -> Role | None:
+        cached_role = role_cache.get_by_name(name=name)
+        if cached_role is not None:
+            return await self.db.merge(cached_role, load=False)
         result = await self.db.execute(select(Role).where(Role.name == name))
         role = result.scalar_one_or_none()
+        if role is not None:
+            role_cache.put(role=role)
         return role
 
     async def get_all(self, page: int, page_size: int):
         offset = (page - 1) * page_size
         result = await self.db.execute(
             select(Role)
+            .order_by(Role.id)
             .offset(offset)
             .limit(page_size)
         )
         roles = result.scalars().all()
-        count_result = await self.db.execute(select(func.count(Role.id)))
-        total_count = count_result.scalar_one()
-        return roles, total_count
+        return roles
+
+    async def count(self, strategy: CountStrategy) -> tuple[int | None, CountStrategy]:
+        return await self.count_repository.count(model=Role, strategy=strategy)
+
+    async def get_after(self, after_id: UUID | None, limit: int):
+        query = select(Role).order_by(Role.id).limit(limit)
+        if after_id is not None:
+            query = query.where(Role.id > after_id)
+        result = await self.db.execute(query)
+        return result.scalars().all()
 
     async def patch(
             self,
-            role: Role,
+            role_id: UUID,
             name: Optional[str] = None,
             read_posts_access: Optional[bool] = None,
             write_posts_access: Optional[bool] = None,
             delete_posts_access: Optional[bool] = None,
             manage_roles_access: Optional[bool] = None
-    ) -> Role:
+    ) -> Role | None:
+        values = {}
         if name is not None:
-            role.name = name
+            values["name"] = name
         if read_posts_access is not None:
-            role.read_posts_access = read_posts_access
+            values["read_posts_access"] = read_posts_access
         if write_posts_access is not None:
-            role.write_posts_access = write_posts_access
+            values["write_posts_access"] = write_posts_access
         if delete_posts_access is not None:
-            role.delete_posts_access = delete_posts_access
+            values["delete_posts_access"] = delete_posts_access
         if manage_roles_access is not None:
-            role.manage_roles_access = manage_roles_access
+            values["manage_roles_access"] = manage_roles_access
+        if not values:
+            return await self.get_by_id(id=role_id)
 
-        self.db.add(role)
-        await self.db.commit()
-        await self.db.refresh(role)
+        role_cache.invalidate(role_id=role_id)
+        result = await self.db.execute(
+            update(Role)
+            .where(Role.id == role_id)
+            .values(**values)
+            .returning(Role)
+        )
+        role = result.scalar_one_or_none()
+        if role is not None:
+            on_commit(session=self.db, callback=lambda: self._after_patch(role_id=role_id, name=name))
         return role
+
+    def _after_post(self, role_id: UUID, name: str) -> None:
+        role_cache.invalidate(role_id=role_id, name=name)
+        cache.invalidate_later(keys=[f"role:{role_id}"])
+
+    def _after_patch(self, role_id: UUID, name: str | None) -> None:
+        role_cache.invalidate(role_id=role_id, name=name)
+        permission_versions.bump_later(kind="role", key_id=role_id)
+        cache.invalidate_later(keys=[f"role:{role_id}"])
@@ -1,14 +1,28 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 from models.user import User
+from models.role import Role
 from uuid import UUID
+from repository.count_repository import CountRepository
+from repository.role_repository import RoleRepository
+from schemas.internal.pagination_schemas import CountStrategy
 from typing import Optional
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from utils.permissions import permission_versions
+from database.database import on_commit
+from utils.cache import cache
+from utils.single_flight import get_single_flight
+
+
+user_flight = get_single_flight(name="user")
 
 
 class UserRepository:
     def __init__(self, db: AsyncSession):
         self.db: AsyncSession = db
+        self.count_repository: CountRepository = CountRepository(db=db)
 
     async def post(
             self,
@@ -18,18 +32,21 @@ class UserRepository:
             email: str,
             password: str,
             role_id: UUID
-    ) -> User:
-        new_user = User(
-            name=name,
-            surname=surname,
-            patronymic=patronymic,
-            email=email,
-            password=password,
-            role_id=role_id
+    ) -> User | None:
+        result = await self.db.execute(
+            insert(User)
+            .values(
+                name=name,
+                surname=surname,
+                patronymic=patronymic,
+                email=email,
+                password=password,
+                role_id=role_id
+            )
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
         )
-        self.db.add(new_user)
-        await self.db.commit()
-        await self.db.refresh(new_user)
+        new_user = result.scalar_one_or_none()
         return new_user
 
     async def get_by_email(self, email: str) -> User | None:
@@ -38,52 +55,107 @@ class UserRepository:
         return user
 
     async def get_by_id(self, id: UUID) -> User | None:
+        return await self.db.get(User, id)
+
+    async def get_with_role(self, id: UUID) -> User | None:
+        values = await user_flight.do(key=(self.db.bind, id), func=lambda: self.load_values(id=id))
+        if values is None:
+            return None
+        # Coalesced callers share plain values, each session gets its own detached copy merged in
+        user = User(**values)
+        make_transient_to_detached(user)
+        user = await self.db.merge(user, load=False)
+        # The role comes from the role cache, so a permission check costs one user lookup
+        role = await RoleRepository(db=self.db).get_by_id(id=user.role_id) if user.role_id is not None else None
+        set_committed_value(user, "role", role)
+        return user
+
+    async def load_values(self, id: UUID) -> dict | None:
         result = await self.db.execute(select(User).where(User.id == id))
         user = result.scalar_one_or_none()
-        return user
+        if user is None:
+            return None
+        return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+    def select_fields(self, fields: list[str]):
+        columns = []
+        for field in fields:
+            if field == "role_name":
+                columns.append(Role.name.label("role_name"))
+            else:
+                columns.append(getattr(User, field))
+        query = select(*columns).select_from(User)
+        if "role_name" in fields:
+            query = query.outerjoin(Role, User.role_id == Role.id)
+        return query
 
-    async def get_all(self, page: int, page_size: int):
+    async def get_all(self, page: int, page_size: int, fields: list[str]):
         offset = (page - 1) * page_size
         result = await self.db.execute(
-            select(User)
+            self.select_fields(fields=fields)
+            .order_by(User.id)
             .offset(offset)
             .limit(page_size)
-            .options(
-                selectinload(User.role)
-            )
         )
-        users = result.scalars().all()
+        users = result.mappings().all()
+
+        return users
 
-        count_result = await self.db.execute(select(func.count(User.id)))
-        total_count = count_result.scalar_one()
-        return users, total_count
+    async def count(self, strategy: CountStrategy) -> tuple[int | None, CountStrategy]:
+        return await self.count_repository.count(model=User, strategy=strategy)
+
+    async def get_after(self, after_id: UUID | None, limit: int, fields: list[str]):
+        query = (
+            self.select_fields(fields=fields)
+            .order_by(User.id)
+            .limit(limit)
+        )
+        if after_id is not None:
+            query = query.where(User.id > after_id)
+        result = await self.db.execute(query)
+        return result.mappings().all()
 
     async def patch(
             self,
-            user: User,
+            user_id: UUID,
             name: Optional[str] = None,
             surname: Optional[str] = None,
             patronymic: Optional[str] = None,
             is_active: Optional[bool] = None
-    ) -> User:
+    ) -> User | None:
+        values = {}
         if name is not None:
-            user.name = name
+            values["name"] = name
         if surname is not None:
-            user.surname = surname
+            values["surname"] = surname
         if patronymic is not None:
-            user.patronymic = patronymic
-
+            values["patronymic"] = patronymic
         if is_active is not None:
-            user.is_active = is_active
+            values["is_active"] = is_active
+        if not values:
+            return await self.get_by_id(id=user_id)
 
-        self.db.add(user)
-        await self.db.commit()
-        await self.db.refresh(user)
+        result = await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(**values)
+            .returning(User)
+        )
+        user = result.scalar_one_or_none()
         return user
 
-    async def change_role(self, user: User, role_id: UUID) -> User:
-        user.role_id = role_id
-        self.db.add(user)
-        await self.db.commit()
-        await self.db.refresh(user)
+    async def change_role(self, user_id: UUID, role_id: UUID) -> User | None:
+        result = await self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(role_id=role_id)
+            .returning(User)
+        )
+        user = result.scalar_one_or_none()
+        if user is not None:
+            on_commit(session=self.db, callback=lambda: self._after_change_role(user_id=user_id))
         return user
+
+    def _after_change_role(self, user_id: UUID) -> None:
+        permission_versions.bump_later(kind="user", key_id=user_id)
+        cache.invalidate_later(keys=[f"user:{user_id}"])
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class ListView(str, Enum):
+    full = "full"
+    summary = "summary"
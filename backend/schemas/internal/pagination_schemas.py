@@ -1,8 +1,25 @@
 from pydantic import BaseModel
+from typing import Optional
+from enum import Enum
+
+
+class PaginationMode(str, Enum):
+    offset = "offset"
+    cursor = "cursor"
+
+
+class CountStrategy(str, Enum):
+    exact = "exact"
+    estimate = "estimate"
+    cached = "cached"
+    counter = "counter"
+    none = "none"
 
 
 class PaginationSchema(BaseModel):
-    page: int
+    page: Optional[int] = None
     page_size: int
-    total_count: int
-    total_pages: int
+    total_count: Optional[int] = None
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    count_strategy: Optional[CountStrategy] = None
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from uuid import UUID
+from schemas.internal.role_rights_schemas import RoleRightsSchema
+
+
+class PrincipalSchema(BaseModel):
+    user_id: UUID
+    role_id: UUID | None
+    role_rights: RoleRightsSchema
@@ -0,0 +1,61 @@
+from pydantic import BaseModel
+
+
+class CacheStatsResponseSchema(BaseModel):
+    hits: int
+    misses: int
+    size: int
+    hit_ratio: float
+
+
+class HashPoolStatsResponseSchema(BaseModel):
+    kind: str
+    workers: int
+    queue_depth: int
+    max_queue_size: int
+    completed: int
+    rejected: int
+    average_latency_ms: float
+    max_latency_ms: float
+
+
+class PoolStatsResponseSchema(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    waiting: int
+    timeouts: int
+
+
+class ResponseCacheStatsResponseSchema(BaseModel):
+    backend: str
+    hits: int
+    stale_hits: int
+    misses: int
+    refreshes: int
+    invalidations: int
+    reconnects: int
+    hit_ratio: float
+
+
+class SingleFlightStatsResponseSchema(BaseModel):
+    name: str
+    calls: int
+    executions: int
+    coalesced: int
+    retries: int
+    in_flight: int
+    coalescing_ratio: float
+
+
+class ConcurrencyLimiterStatsResponseSchema(BaseModel):
+    name: str
+    limit: int
+    in_flight: int
+    waiting: int
+    accepted: int
+    shed: int
+    queued: int
+    average_queue_wait_ms: float
+    max_queue_wait_ms: float
@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+
+class JwksResponseSchema(BaseModel):
+    keys: list[dict]
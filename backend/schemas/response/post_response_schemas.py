@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 from uuid import UUID
+from typing import Optional
+from schemas.response.sparse_schemas import SparseSchema
 from schemas.internal.pagination_schemas import PaginationSchema
 
 
@@ -12,3 +14,15 @@ class PostResponseSchema(BaseModel):
 class PostsResponseSchema(BaseModel):
     pagination: PaginationSchema
     posts: list[PostResponseSchema]
+
+
+class PostListItemSchema(SparseSchema):
+    id: Optional[UUID] = None
+    title: Optional[str] = None
+    text: Optional[str] = None
+    preview: Optional[str] = None
+
+
+class PostListResponseSchema(BaseModel):
+    pagination: PaginationSchema
+    posts: list[PostListItemSchema]
@@ -0,0 +1,8 @@
+from typing import Any
+from pydantic import BaseModel, model_serializer
+
+
+class SparseSchema(BaseModel):
+    @model_serializer(mode="plain")
+    def serialize_selected_fields(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in type(self).model_fields if name in self.model_fields_set}
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 from uuid import UUID
+from typing import Optional
+from schemas.response.sparse_schemas import SparseSchema
 from schemas.internal.token_schemas import TokenInfoSchema
 from schemas.internal.pagination_schemas import PaginationSchema
 
@@ -37,6 +39,15 @@ class UserWithRoleNameResponseSchema(UserFullInfoSchema):
     role_name: str
 
 
+class UserListItemSchema(SparseSchema):
+    id: Optional[UUID] = None
+    name: Optional[str] = None
+    surname: Optional[str] = None
+    patronymic: Optional[str] = None
+    email: Optional[str] = None
+    role_name: Optional[str] = None
+
+
 class UsersResponseSchema(BaseModel):
     pagination: PaginationSchema
-    users: list[UserWithRoleNameResponseSchema]
+    users: list[UserListItemSchema]
@@ -0,0 +1,61 @@
+from fastapi import HTTPException, status
+from schemas.internal.principal_schemas import PrincipalSchema
+from schemas.response.internal_response_schemas import CacheStatsResponseSchema, HashPoolStatsResponseSchema
+from schemas.response.internal_response_schemas import PoolStatsResponseSchema, ResponseCacheStatsResponseSchema
+from schemas.response.internal_response_schemas import SingleFlightStatsResponseSchema, ConcurrencyLimiterStatsResponseSchema
+from utils.role_cache import role_cache
+from utils.hasher import hash_pool
+from utils.cache import cache
+from utils.single_flight import single_flights
+from middleware.concurrency_limit import concurrency_limiters
+from database.database import engine
+
+
+class InternalService:
+    async def get_role_cache_stats(self, principal: PrincipalSchema) -> CacheStatsResponseSchema:
+        if not principal.role_rights.manage_roles_access:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
+            )
+        return CacheStatsResponseSchema(**role_cache.stats())
+
+    async def get_hash_pool_stats(self, principal: PrincipalSchema) -> HashPoolStatsResponseSchema:
+        if not principal.role_rights.manage_roles_access:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
+            )
+        return HashPoolStatsResponseSchema(**hash_pool.stats())
+
+    async def get_pool_stats(self, principal: PrincipalSchema) -> PoolStatsResponseSchema:
+        if not principal.role_rights.manage_roles_access:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
+            )
+        return PoolStatsResponseSchema(**engine.pool.stats())
+
+    async def get_cache_stats(self, principal: PrincipalSchema) -> ResponseCacheStatsResponseSchema:
+        if not principal.role_rights.manage_roles_access:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
+            )
+        return ResponseCacheStatsResponseSchema(**cache.stats())
+
+    async def get_single_flight_stats(self, principal: PrincipalSchema) -> list[SingleFlightStatsResponseSchema]:
+        if not principal.role_rights.manage_roles_access:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
+            )
+        return [SingleFlightStatsResponseSchema(**flight.stats()) for flight in single_flights.values()]
+
+    async def get_concurrency_stats(self, principal: PrincipalSchema) -> list[ConcurrencyLimiterStatsResponseSchema]:
+        if not principal.role_rights.manage_roles_access:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
+            )
+        return [ConcurrencyLimiterStatsResponseSchema(**limiter.stats()) for limiter in concurrency_limiters.values()]
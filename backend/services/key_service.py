@@ -0,0 +1,10 @@
+from fastapi import Response
+from configuration import settings
+from schemas.response.key_response_schemas import JwksResponseSchema
+from utils.key_manager import key_manager
+
+
+class KeyService:
+    async def get_jwks(self, response: Response) -> JwksResponseSchema:
+        response.headers["Cache-Control"] = f"public, max-age={settings.jwks_cache_max_age}"
+        return JwksResponseSchema(**key_manager.jwks())
@@ -0,0 +1,8 @@
+from fastapi import Response
+from utils.metrics import render_metrics
+
+
+class MetricsService:
+    async def get_metrics(self) -> Response:
+        content, media_type = render_metrics()
+        return Response(content=content, media_type=media_type)
@@ -1,166 +1,216 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import get_read_session_factory
 from repository.post_repository import PostRepository
-from repository.user_repository import UserRepository
-from repository.role_repository import RoleRepository
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Response, status
 from schemas.request.post_request_schemas import PostRequestSchema
-from schemas.response.post_response_schemas import PostResponseSchema, PostsResponseSchema
+from schemas.response.post_response_schemas import PostResponseSchema, PostsResponseSchema, PostListItemSchema, PostListResponseSchema
+from schemas.internal.list_view_schemas import ListView
+from utils.fields import parse_fields
+from utils.http_cache import make_etag, etag_matches, set_cache_headers, not_modified
+from utils.cache import cache
+from configuration import settings
 from schemas.response.item_delete_response_schemas import ItemDeleteResponse
-from schemas.internal.pagination_schemas import PaginationSchema
-from utils.jwt_utils import decode_jwt
-from jwt import ExpiredSignatureError
+from schemas.internal.pagination_schemas import PaginationSchema, PaginationMode, CountStrategy
+from utils.cursor import encode_id_cursor, decode_id_cursor, encode_rank_cursor, decode_rank_cursor
+from schemas.internal.principal_schemas import PrincipalSchema
 from uuid import UUID
 
 
 class PostService:
     def __init__(self, db: AsyncSession):
         self.post_repository: PostRepository = PostRepository(db=db)
-        self.user_repository: UserRepository = UserRepository(db=db)
-        self.role_repository: RoleRepository = RoleRepository(db=db)
 
-    async def create(self, payload: PostRequestSchema, encoded_jwt: str | None) -> PostResponseSchema:
-        if encoded_jwt is None:
+    async def create(self, payload: PostRequestSchema, principal: PrincipalSchema) -> PostResponseSchema:
+        if not principal.role_rights.write_posts_access:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен не найден"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
             )
-        try:
-            user_id = decode_jwt(token=encoded_jwt)
-            user = await self.user_repository.get_by_id(id=user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Пользователь не найден"
-                )
-            user_role = await self.role_repository.get_by_id(id=user.role_id)
-            if not user_role.write_posts_access:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Нет прав"
-                )
-            post = await self.post_repository.post(title=payload.title, text=payload.text, author_id=user.id)
+        post = await self.post_repository.post(title=payload.title, text=payload.text, author_id=principal.user_id)
 
-            return PostResponseSchema(
-                id=post.id,
-                title=post.title,
-                text=post.text
-            )
-        except ExpiredSignatureError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен истек"
-            )
+        return PostResponseSchema(
+            id=post.id,
+            title=post.title,
+            text=post.text
+        )
 
-    async def get_all(self, encoded_jwt: str | None, page: int, page_size: int):
-        if encoded_jwt is None:
+    async def get_all(
+            self,
+            principal: PrincipalSchema,
+            page: int,
+            page_size: int,
+            mode: PaginationMode = PaginationMode.offset,
+            cursor: str | None = None,
+            count_strategy: CountStrategy = CountStrategy.exact,
+            fields: str | None = None,
+            view: ListView = ListView.full,
+            response: Response | None = None,
+            if_none_match: str | None = None
+    ) -> PostListResponseSchema | Response:
+        if not principal.role_rights.read_posts_access:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен не найден"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
             )
-        try:
-            user_id = decode_jwt(token=encoded_jwt)
-            user = await self.user_repository.get_by_id(id=user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Пользователь не найден"
-                )
-            user_role = await self.role_repository.get_by_id(id=user.role_id)
-            if not user_role.read_posts_access:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Нет прав"
-                )
-            posts, total_count = await self.post_repository.get_all(page=page, page_size=page_size)
-
-            posts_response = []
-            for post in posts:
-                posts_response.append(PostResponseSchema(
-                    id=post.id,
-                    title=post.title,
-                    text=post.text
-                ))
-
-            return PostsResponseSchema(
-                pagination=PaginationSchema(
-                    page=page,
-                    page_size=page_size,
-                    total_count=total_count,
-                    total_pages=(total_count + page_size - 1) // page_size
-                ),
-                posts=posts_response
+        selected_fields = parse_fields(
+            fields=fields,
+            allowed=tuple(PostListItemSchema.model_fields),
+            default=("id", "title", "preview") if view == ListView.summary else ("id", "title", "text")
+        )
+        # The version is read before the page, so a concurrent write can only make the ETag older than the body
+        etag = make_etag(
+            "posts",
+            await self.post_repository.collection_version(),
+            page,
+            page_size,
+            mode.value,
+            cursor,
+            count_strategy.value,
+            ",".join(selected_fields),
+            settings.post_preview_length
+        )
+        if etag_matches(if_none_match=if_none_match, etag=etag):
+            return not_modified(etag=etag, cache_control=settings.post_list_cache_control)
+        if response is not None:
+            set_cache_headers(response=response, etag=etag, cache_control=settings.post_list_cache_control)
+        if mode == PaginationMode.cursor or cursor is not None:
+            posts = await self.post_repository.get_after(
+                after_id=decode_id_cursor(cursor),
+                limit=page_size + 1,
+                fields=selected_fields,
+                preview_length=settings.post_preview_length
             )
-        except ExpiredSignatureError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен истек"
+            pagination = PaginationSchema(
+                page_size=page_size,
+                next_cursor=encode_id_cursor(posts[page_size - 1]["id"]) if len(posts) > page_size else None
+            )
+            posts = posts[:page_size]
+        else:
+            posts = await self.post_repository.get_all(
+                page=page,
+                page_size=page_size,
+                fields=selected_fields,
+                preview_length=settings.post_preview_length
             )
+            total_count, count_strategy = await self.post_repository.count(strategy=count_strategy)
+            pagination = PaginationSchema(
+                page=page,
+                page_size=page_size,
+                total_count=total_count,
+                total_pages=(total_count + page_size - 1) // page_size if total_count is not None else None,
+                count_strategy=count_strategy
+            )
+
+        return PostListResponseSchema(
+            pagination=pagination,
+            posts=[PostListItemSchema(**post) for post in posts]
+        )
 
-    async def get(self, post_id: UUID, encoded_jwt: str | None):
-        if encoded_jwt is None:
+    async def search(
+            self,
+            principal: PrincipalSchema,
+            query: str,
+            page_size: int,
+            cursor: str | None = None
+    ) -> PostsResponseSchema:
+        if not principal.role_rights.read_posts_access:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен не найден"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
             )
-        try:
-            user_id = decode_jwt(token=encoded_jwt)
-            user = await self.user_repository.get_by_id(id=user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Пользователь не найден"
-                )
-            user_role = await self.role_repository.get_by_id(id=user.role_id)
-            if not user_role.read_posts_access:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Нет прав"
-                )
-            post = await self.post_repository.get_by_id(post_id=post_id)
-            if not post:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Пост не найден"
-                )
+        rows = await self.post_repository.search(query=query, after=decode_rank_cursor(cursor), limit=page_size + 1)
+        next_cursor = None
+        if len(rows) > page_size:
+            last_post, last_rank = rows[page_size - 1]
+            next_cursor = encode_rank_cursor(rank=last_rank, item_id=last_post.id)
 
-            return PostResponseSchema(
+        posts_response = []
+        for post, rank in rows[:page_size]:
+            posts_response.append(PostResponseSchema(
                 id=post.id,
                 title=post.title,
                 text=post.text
+            ))
+
+        return PostsResponseSchema(
+            pagination=PaginationSchema(
+                page_size=page_size,
+                next_cursor=next_cursor
+            ),
+            posts=posts_response
+        )
+
+    async def get(
+            self,
+            post_id: UUID,
+            principal: PrincipalSchema,
+            response: Response | None = None,
+            if_none_match: str | None = None
+    ) -> PostResponseSchema | Response:
+        if not principal.role_rights.read_posts_access:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
             )
-        except ExpiredSignatureError:
+        post = await cache.get_or_load(key=f"post:{post_id}", loader=lambda: self.load_post(post_id=post_id))
+        if not post:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен истек"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Пост не найден"
             )
+        etag = make_etag("post", post["id"], post["version"])
+        if etag_matches(if_none_match=if_none_match, etag=etag):
+            return not_modified(etag=etag, cache_control=settings.post_cache_control)
+        if response is not None:
+            set_cache_headers(response=response, etag=etag, cache_control=settings.post_cache_control)
+
+        return PostResponseSchema(
+            id=post["id"],
+            title=post["title"],
+            text=post["text"]
+        )
 
-    async def delete(self, encoded_jwt: str | None, post_id: UUID) -> ItemDeleteResponse:
-        if encoded_jwt is None:
+    async def load_post(self, post_id: UUID) -> dict | None:
+        post = await self.post_repository.get_by_id(post_id=post_id)
+        if not post:
+            return None
+        return {
+            "id": str(post.id),
+            "title": post.title,
+            "text": post.text,
+            "version": post.version
+        }
+
+    async def export(self, principal: PrincipalSchema, chunk_size: int):
+        if not principal.role_rights.read_posts_access:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен не найден"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
             )
-        try:
-            user_id = decode_jwt(token=encoded_jwt)
-            user = await self.user_repository.get_by_id(id=user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Пользователь не найден"
-                )
-            user_role = await self.role_repository.get_by_id(id=user.role_id)
-            if not user_role.delete_posts_access:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Нет прав"
+        return self.stream_posts(chunk_size=chunk_size)
+
+    async def stream_posts(self, chunk_size: int):
+        # The request session is closed before the body is sent, so the stream owns its own session
+        session_factory = await get_read_session_factory()
+        async with session_factory() as db:
+            async for posts in PostRepository(db=db).stream_all(chunk_size=chunk_size):
+                yield "".join(
+                    PostResponseSchema(
+                        id=post.id,
+                        title=post.title,
+                        text=post.text
+                    ).model_dump_json() + "\n"
+                    for post in posts
                 )
-            row_count = await self.post_repository.delete(post_id=post_id)
-            return ItemDeleteResponse(
-                item_id=post_id,
-                row_count=row_count
-            )
-        except ExpiredSignatureError:
+
+    async def delete(self, principal: PrincipalSchema, post_id: UUID) -> ItemDeleteResponse:
+        if not principal.role_rights.delete_posts_access:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен истек"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
             )
+        row_count = await self.post_repository.delete(post_id=post_id)
+        return ItemDeleteResponse(
+            item_id=post_id,
+            row_count=row_count
+        )
@@ -1,165 +1,124 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from repository.role_repository import RoleRepository
-from repository.user_repository import UserRepository
 from schemas.request.role_request_schemas import RoleRequestSchema, RolePatchRequestSchema
 from schemas.response.role_response_schemas import RoleResponseSchema, RolesResponseSchema
 from schemas.internal.role_rights_schemas import RoleRightsSchema
+from schemas.internal.principal_schemas import PrincipalSchema
 from fastapi import HTTPException, status
-from utils.jwt_utils import decode_jwt
-from jwt import ExpiredSignatureError
-from schemas.internal.pagination_schemas import PaginationSchema
+from schemas.internal.pagination_schemas import PaginationSchema, PaginationMode, CountStrategy
+from utils.cursor import encode_id_cursor, decode_id_cursor
 from uuid import UUID
 
 
 class RoleService:
     def __init__(self, db: AsyncSession):
         self.role_repository: RoleRepository = RoleRepository(db=db)
-        self.user_repository: UserRepository = UserRepository(db=db)
 
-    async def create(self, payload: RoleRequestSchema, encoded_jwt: str | None) -> RoleResponseSchema:
-        if not encoded_jwt:
+    async def create(self, payload: RoleRequestSchema, principal: PrincipalSchema) -> RoleResponseSchema:
+        if not principal.role_rights.manage_roles_access:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен не найден"
-            )
-        try:
-            user_id = decode_jwt(token=encoded_jwt)
-            user = await self.user_repository.get_by_id(id=user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Пользователь не найден"
-                )
-            user_role = await self.role_repository.get_by_id(id=user.role_id)
-            if not user_role.manage_roles_access:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Нет прав"
-                )
-            new_role = await self.role_repository.post(
-                role_name=payload.name,
-                read_posts_access=payload.role_rights.read_posts_access,
-                write_posts_access=payload.role_rights.write_posts_access,
-                delete_posts_access=payload.role_rights.delete_posts_access,
-                manage_roles_access=payload.role_rights.manage_roles_access
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
             )
+        new_role = await self.role_repository.post(
+            role_name=payload.name,
+            read_posts_access=payload.role_rights.read_posts_access,
+            write_posts_access=payload.role_rights.write_posts_access,
+            delete_posts_access=payload.role_rights.delete_posts_access,
+            manage_roles_access=payload.role_rights.manage_roles_access
+        )
 
-            return RoleResponseSchema(
-                id=new_role.id,
-                name=new_role.name,
-                role_rights=RoleRightsSchema(
-                    read_posts_access=new_role.read_posts_access,
-                    write_posts_access=new_role.write_posts_access,
-                    delete_posts_access=new_role.delete_posts_access,
-                    manage_roles_access=new_role.manage_roles_access
-                )
-            )
-        except ExpiredSignatureError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен истек"
+        return RoleResponseSchema(
+            id=new_role.id,
+            name=new_role.name,
+            role_rights=RoleRightsSchema(
+                read_posts_access=new_role.read_posts_access,
+                write_posts_access=new_role.write_posts_access,
+                delete_posts_access=new_role.delete_posts_access,
+                manage_roles_access=new_role.manage_roles_access
             )
+        )
 
     async def get_all_roles(
             self,
-            encoded_jwt: str | None,
+            principal: PrincipalSchema,
             page: int,
             page_size: int,
+            mode: PaginationMode = PaginationMode.offset,
+            cursor: str | None = None,
+            count_strategy: CountStrategy = CountStrategy.exact
     ) -> RolesResponseSchema:
-        if not encoded_jwt:
+        if not principal.role_rights.manage_roles_access:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен не найден"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
             )
-        try:
-            user_id = decode_jwt(token=encoded_jwt)
-            user = await self.user_repository.get_by_id(id=user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Пользователь не найден"
-                )
-            user_role = await self.role_repository.get_by_id(id=user.role_id)
-            if not user_role.manage_roles_access:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Нет прав"
-                )
-            roles, total_count = await self.role_repository.get_all(page=page, page_size=page_size)
-            roles_response = []
-            for role in roles:
-                roles_response.append(RoleResponseSchema(
-                    id=role.id,
-                    name=role.name,
-                    role_rights=RoleRightsSchema(
-                        read_posts_access=role.read_posts_access,
-                        write_posts_access=role.write_posts_access,
-                        delete_posts_access=role.delete_posts_access,
-                        manage_roles_access=role.manage_roles_access
-                    )
-                ))
-
-            return RolesResponseSchema(
-                pagination=PaginationSchema(
-                    page=page,
-                    page_size=page_size,
-                    total_count=total_count,
-                    total_pages=(total_count + page_size - 1) // page_size
-                ),
-                roles=roles_response
+        if mode == PaginationMode.cursor or cursor is not None:
+            roles = await self.role_repository.get_after(after_id=decode_id_cursor(cursor), limit=page_size + 1)
+            pagination = PaginationSchema(
+                page_size=page_size,
+                next_cursor=encode_id_cursor(roles[page_size - 1].id) if len(roles) > page_size else None
             )
-        except ExpiredSignatureError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен истек"
+            roles = roles[:page_size]
+        else:
+            roles = await self.role_repository.get_all(page=page, page_size=page_size)
+            total_count, count_strategy = await self.role_repository.count(strategy=count_strategy)
+            pagination = PaginationSchema(
+                page=page,
+                page_size=page_size,
+                total_count=total_count,
+                total_pages=(total_count + page_size - 1) // page_size if total_count is not None else None,
+                count_strategy=count_strategy
             )
+        roles_response = []
+        for role in roles:
+            roles_response.append(RoleResponseSchema(
+                id=role.id,
+                name=role.name,
+                role_rights=RoleRightsSchema(
+                    read_posts_access=role.read_posts_access,
+                    write_posts_access=role.write_posts_access,
+                    delete_posts_access=role.delete_posts_access,
+                    manage_roles_access=role.manage_roles_access
+                )
+            ))
+
+        return RolesResponseSchema(
+            pagination=pagination,
+            roles=roles_response
+        )
 
     async def edit_role(
             self,
             role_id: UUID,
             payload: RolePatchRequestSchema,
-            encoded_jwt: str | None
+            principal: PrincipalSchema
     ) -> RoleResponseSchema:
-        if not encoded_jwt:
+        if not principal.role_rights.manage_roles_access:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен не найден"
-            )
-        try:
-            user_id = decode_jwt(token=encoded_jwt)
-            user = await self.user_repository.get_by_id(id=user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Пользователь не найден"
-                )
-            user_role = await self.role_repository.get_by_id(id=user.role_id)
-            if not user_role.manage_roles_access:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Нет прав"
-                )
-            role = await self.role_repository.get_by_id(id=role_id)
-            edited_role = await self.role_repository.patch(
-                role=role,
-                name=payload.name,
-                read_posts_access=payload.role_rights.read_posts_access,
-                write_posts_access=payload.role_rights.write_posts_access,
-                delete_posts_access=payload.role_rights.delete_posts_access,
-                manage_roles_access=payload.role_rights.manage_roles_access
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
             )
-            return RoleResponseSchema(
-                id=edited_role.id,
-                name=edited_role.name,
-                role_rights=RoleRightsSchema(
-                    read_posts_access=edited_role.read_posts_access,
-                    write_posts_access=edited_role.write_posts_access,
-                    delete_posts_access=edited_role.delete_posts_access,
-                    manage_roles_access=edited_role.manage_roles_access
-                )
-            )
-        except ExpiredSignatureError:
+        edited_role = await self.role_repository.patch(
+            role_id=role_id,
+            name=payload.name,
+            read_posts_access=payload.role_rights.read_posts_access,
+            write_posts_access=payload.role_rights.write_posts_access,
+            delete_posts_access=payload.role_rights.delete_posts_access,
+            manage_roles_access=payload.role_rights.manage_roles_access
+        )
+        if not edited_role:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен истек"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Роль не найдена"
+            )
+        return RoleResponseSchema(
+            id=edited_role.id,
+            name=edited_role.name,
+            role_rights=RoleRightsSchema(
+                read_posts_access=edited_role.read_posts_access,
+                write_posts_access=edited_role.write_posts_access,
+                delete_posts_access=edited_role.delete_posts_access,
+                manage_roles_access=edited_role.manage_roles_access
             )
+        )
@@ -4,14 +4,19 @@ from repository.role_repository import RoleRepository
 from schemas.request.user_request_schemas import UserRegistrationRequestSchema, UserLoginRequestSchema, UserPatchRequestSchema
 from schemas.response.user_response_schemas import UserInfoSchema, UserLogoutSchema, UserChangedRoleResponseSchema
 from fastapi import Response, HTTPException, status
-from schemas.response.user_response_schemas import UserAuthSchema, UserFullInfoSchema, UsersResponseSchema, UserWithRoleNameResponseSchema
+from schemas.response.user_response_schemas import UserAuthSchema, UserFullInfoSchema, UsersResponseSchema, UserListItemSchema
+from utils.fields import parse_fields
 from schemas.internal.token_schemas import TokenInfoSchema
-from schemas.internal.pagination_schemas import PaginationSchema
-from utils.jwt_utils import generate_token, decode_jwt
+from schemas.internal.pagination_schemas import PaginationSchema, PaginationMode, CountStrategy
+from utils.cursor import encode_id_cursor, decode_id_cursor
+from utils.jwt_utils import generate_token, decode_jwt, purge_verified_tokens
 from configuration import settings
-from utils.hasher import get_hash, match_hash
+from utils.hasher import get_hash_async, match_hash_async
 from jwt import ExpiredSignatureError
 from schemas.request.user_request_schemas import UserChangeRoleRequestSchema
+from schemas.internal.principal_schemas import PrincipalSchema
+from utils.permissions import permission_claims
+from uuid import UUID
 
 
 class UserService:
@@ -29,23 +34,31 @@ class UserService:
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Пароли не совпадают"
             )
-        optional_user = await self.user_repository.get_by_email(email=payload.email)
-        if optional_user:
+        role = await self.role_repository.get_by_name(name=settings.default_role_name)
+        if not role:
             raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Пользователь с такой почтой уже существует"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Роль не найдена"
             )
-        role = await self.role_repository.get_by_name(name="user")
         user = await self.user_repository.post(
             name=payload.name,
             surname=payload.surname,
             patronymic=payload.patronymic,
             email=payload.email,
-            password=get_hash(item=payload.password),
+            password=await get_hash_async(item=payload.password),
             role_id=role.id
         )
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Пользователь с такой почтой уже существует"
+            )
 
-        access_token = generate_token(user_id=user.id, token_type="access")
+        access_token = generate_token(
+            user_id=user.id,
+            token_type="access",
+            claims=await self.permission_claims(user_id=user.id, role_id=user.role_id)
+        )
         refresh_token = generate_token(user_id=user.id, token_type="refresh")
 
         response.set_cookie(
@@ -81,13 +94,16 @@ class UserService:
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Неправильный логин или пароль"
             )
-        if not match_hash(item=payload.password, item_hash=user.password):
+        if not await match_hash_async(item=payload.password, item_hash=user.password):
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Неправильный логин или пароль"
             )
-
-        access_token = generate_token(user_id=user.id, token_type="access")
+        access_token = generate_token(
+            user_id=user.id,
+            token_type="access",
+            claims=await self.permission_claims(user_id=user.id, role_id=user.role_id)
+        )
         refresh_token = generate_token(user_id=user.id, token_type="refresh")
 
         response.set_cookie(
@@ -110,38 +126,25 @@ class UserService:
     async def update(
             self,
             payload: UserPatchRequestSchema,
-            encoded_jwt: str | None
+            principal: PrincipalSchema
     ) -> UserInfoSchema:
-        if not encoded_jwt:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен не найден"
-            )
-        try:
-            user_id = decode_jwt(token=encoded_jwt)
-            user = await self.user_repository.get_by_id(id=user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Пользователь не найден"
-                )
-            updated_user = await self.user_repository.patch(
-                user=user,
-                name=payload.name,
-                surname=payload.surname,
-                patronymic=payload.patronymic
-            )
-            return UserInfoSchema(
-                id=updated_user.id,
-                name=updated_user.name,
-                surname=updated_user.surname,
-                patronymic=updated_user.patronymic
-            )
-        except ExpiredSignatureError:
+        updated_user = await self.user_repository.patch(
+            user_id=principal.user_id,
+            name=payload.name,
+            surname=payload.surname,
+            patronymic=payload.patronymic
+        )
+        if not updated_user:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен истек"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Пользователь не найден"
             )
+        return UserInfoSchema(
+            id=updated_user.id,
+            name=updated_user.name,
+            surname=updated_user.surname,
+            patronymic=updated_user.patronymic
+        )
 
     async def refresh_token(self, refresh_token: str | None, response: Response):
         if not refresh_token:
@@ -157,7 +160,11 @@ class UserService:
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Пользователь не найден"
                 )
-            access_token = generate_token(user_id=user.id, token_type="access")
+            access_token = generate_token(
+                user_id=user.id,
+                token_type="access",
+                claims=await self.permission_claims(user_id=user.id, role_id=user.role_id)
+            )
             refresh_token = generate_token(user_id=user.id, token_type="refresh")
 
             response.set_cookie(
@@ -183,159 +190,120 @@ class UserService:
                 detail="Токен истек"
             )
 
+    async def permission_claims(self, user_id: UUID, role_id: UUID) -> dict | None:
+        return await permission_claims(
+            user_id=user_id,
+            role_id=role_id,
+            load_role=lambda: self.role_repository.get_by_user_id(user_id=user_id)
+        )
+
     async def logout(self, response: Response):
         response.delete_cookie(key="refresh_token", secure=True, samesite="none", httponly=True)
         return UserLogoutSchema(
             message="Refresh token был удален"
         )
 
-    async def delete(self, encoded_jwt: str | None, response: Response, refresh_token: str | None):
-        if not encoded_jwt or not refresh_token:
+    async def delete(self, principal: PrincipalSchema, response: Response, refresh_token: str | None):
+        if not refresh_token:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Не найден токен"
             )
-        try:
-            user_id = decode_jwt(token=encoded_jwt)
-            user = await self.user_repository.get_by_id(id=user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Пользователь не найден"
-                )
+        await self.user_repository.patch(user_id=principal.user_id, is_active=False)
+        purge_verified_tokens(user_id=principal.user_id)
+        response.delete_cookie(key="refresh_token", secure=True, samesite="none", httponly=True)
 
-            await self.user_repository.patch(user=user, is_active=False)
-            response.delete_cookie(key="refresh_token", secure=True, samesite="none", httponly=True)
-        except ExpiredSignatureError:
+    async def get_profile(self, principal: PrincipalSchema) -> UserFullInfoSchema:
+        user = await self.user_repository.get_by_id(id=principal.user_id)
+        if not user:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен истек"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Пользователь не найден"
             )
+        return UserFullInfoSchema(
+            id=user.id,
+            name=user.name,
+            surname=user.surname,
+            patronymic=user.patronymic,
+            email=user.email
+        )
 
-    async def get_profile(self, encoded_jwt: str | None) -> UserFullInfoSchema:
-        if not encoded_jwt:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен не найден"
-            )
-        try:
-            user_id = decode_jwt(token=encoded_jwt)
-            user = await self.user_repository.get_by_id(id=user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Пользователь не найден"
-                )
-            return UserFullInfoSchema(
-                id=user.id,
-                name=user.name,
-                surname=user.surname,
-                patronymic=user.patronymic,
-                email=user.email
-            )
-        except ExpiredSignatureError:
+    async def get_all(
+            self,
+            principal: PrincipalSchema,
+            page: int,
+            page_size: int,
+            mode: PaginationMode = PaginationMode.offset,
+            cursor: str | None = None,
+            count_strategy: CountStrategy = CountStrategy.exact,
+            fields: str | None = None
+    ) -> UsersResponseSchema:
+        if not principal.role_rights.manage_roles_access:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен истек"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
             )
+        selected_fields = parse_fields(
+            fields=fields,
+            allowed=tuple(UserListItemSchema.model_fields),
+            default=tuple(UserListItemSchema.model_fields)
+        )
 
-    async def get_all(self, encoded_jwt: str | None, page: int, page_size: int) -> UsersResponseSchema:
-        if encoded_jwt is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен не найден"
+        if mode == PaginationMode.cursor or cursor is not None:
+            users = await self.user_repository.get_after(
+                after_id=decode_id_cursor(cursor),
+                limit=page_size + 1,
+                fields=selected_fields
             )
-        try:
-            user_id = decode_jwt(token=encoded_jwt)
-            user = await self.user_repository.get_by_id(id=user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Пользователь не найден"
-                )
-            user_role = await self.role_repository.get_by_id(id=user.role_id)
-            if not user_role.manage_roles_access:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Нет прав"
-                )
-
-            users, total_count = await self.user_repository.get_all(page=page, page_size=page_size)
-            users_response = []
-            for user in users:
-                users_response.append(UserWithRoleNameResponseSchema(
-                    id=user.id,
-                    name=user.name,
-                    surname=user.surname,
-                    patronymic=user.patronymic,
-                    email=user.email,
-                    role_name=user.role.name
-                ))
-            return UsersResponseSchema(
-                pagination=PaginationSchema(
-                    page=page,
-                    page_size=page_size,
-                    total_count=total_count,
-                    total_pages=(total_count + page_size - 1) // page_size
-                ),
-                users=users_response
+            pagination = PaginationSchema(
+                page_size=page_size,
+                next_cursor=encode_id_cursor(users[page_size - 1]["id"]) if len(users) > page_size else None
             )
-        except ExpiredSignatureError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен истек"
+            users = users[:page_size]
+        else:
+            users = await self.user_repository.get_all(page=page, page_size=page_size, fields=selected_fields)
+            total_count, count_strategy = await self.user_repository.count(strategy=count_strategy)
+            pagination = PaginationSchema(
+                page=page,
+                page_size=page_size,
+                total_count=total_count,
+                total_pages=(total_count + page_size - 1) // page_size if total_count is not None else None,
+                count_strategy=count_strategy
             )
+        return UsersResponseSchema(
+            pagination=pagination,
+            users=[UserListItemSchema(**user) for user in users]
+        )
 
     async def change_role(
             self,
             payload: UserChangeRoleRequestSchema,
-            encoded_jwt: str | None
+            principal: PrincipalSchema
     ) -> UserChangedRoleResponseSchema:
-        if encoded_jwt is None:
+        if not principal.role_rights.manage_roles_access:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен не найден"
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Нет прав"
             )
-        try:
-            user_id = decode_jwt(token=encoded_jwt)
-            user = await self.user_repository.get_by_id(id=user_id)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Пользователь не найден"
-                )
-            user_role = await self.role_repository.get_by_id(id=user.role_id)
-            if not user_role.manage_roles_access:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Нет прав"
-                )
-
-            user_for_edit = await self.user_repository.get_by_id(id=payload.user_id)
-            if not user_for_edit:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Пользователь не найден"
-                )
-            role = await self.role_repository.get_by_id(id=payload.role_id)
-            if not role:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Роль не найдена"
-                )
-            edited_user = await self.user_repository.change_role(user=user_for_edit, role_id=payload.role_id)
 
-            return UserChangedRoleResponseSchema(
-                id=edited_user.id,
-                name=edited_user.name,
-                surname=edited_user.surname,
-                patronymic=edited_user.patronymic,
-                email=edited_user.email,
-                role_name=role.name
+        role = await self.role_repository.get_by_id(id=payload.role_id)
+        if not role:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Роль не найдена"
             )
-
-        except ExpiredSignatureError:
+        edited_user = await self.user_repository.change_role(user_id=payload.user_id, role_id=payload.role_id)
+        if not edited_user:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Токен истек"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Пользователь не найден"
             )
+
+        return UserChangedRoleResponseSchema(
+            id=edited_user.id,
+            name=edited_user.name,
+            surname=edited_user.surname,
+            patronymic=edited_user.patronymic,
+            email=edited_user.email,
+            role_name=role.name
+        )
@@ -0,0 +1,7 @@
+import pytest
+from configuration import settings
+
+
+def pytest_configure(config):
+    if not settings.database_url:
+        raise pytest.UsageError("The tests run against a PostgreSQL database: set DATABASE_URL")
@@ -0,0 +1,152 @@
+import asyncio
+import uuid
+import pytest
+from sqlalchemy import delete, event, select
+from database.database import async_session, engine
+from models.post import Post
+from models.role import Role
+from models.user import User
+from repository.post_repository import PostRepository
+from repository.role_repository import RoleRepository
+from repository.user_repository import UserRepository
+
+PREFIX = "statement-test-"
+
+
+@pytest.fixture(scope="module")
+def runner():
+    with asyncio.Runner() as runner:
+        yield runner
+        runner.run(engine.dispose())
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+def run_rolled_back(runner, scenario):
+    async def run():
+        async with async_session() as session:
+            try:
+                await scenario(session)
+            finally:
+                await session.rollback()
+        # Rows a repository committed on its own are removed as well
+        async with async_session() as session:
+            test_users = select(User.id).where(User.email.startswith(PREFIX))
+            await session.execute(delete(Post).where(Post.author_id.in_(test_users)))
+            await session.execute(delete(User).where(User.email.startswith(PREFIX)))
+            await session.execute(delete(Role).where(Role.name.startswith(PREFIX)))
+            await session.commit()
+
+    runner.run(run())
+
+
+def unique_name() -> str:
+    return f"{PREFIX}{uuid.uuid4().hex}"
+
+
+async def create_user(session):
+    role = await RoleRepository(db=session).post(role_name=unique_name())
+    user = await UserRepository(db=session).post(
+        name="Имя",
+        surname="Фамилия",
+        patronymic="Отчество",
+        email=f"{unique_name()}@example.com",
+        password="hash",
+        role_id=role.id
+    )
+    return role, user
+
+
+def test_post_create_is_one_statement(runner, statements):
+    async def scenario(session):
+        _, user = await create_user(session)
+        statements.clear()
+        await PostRepository(db=session).post(title="Заголовок", text="Текст", author_id=user.id)
+        assert len(statements) == 1
+
+    run_rolled_back(runner, scenario)
+
+
+def test_post_delete_is_one_statement(runner, statements):
+    async def scenario(session):
+        _, user = await create_user(session)
+        post = await PostRepository(db=session).post(title="Заголовок", text="Текст", author_id=user.id)
+        statements.clear()
+        assert await PostRepository(db=session).delete(post_id=post.id) == 1
+        assert len(statements) == 1
+
+    run_rolled_back(runner, scenario)
+
+
+def test_user_create_is_one_statement(runner, statements):
+    async def scenario(session):
+        role = await RoleRepository(db=session).post(role_name=unique_name())
+        statements.clear()
+        user = await UserRepository(db=session).post(
+            name="Имя",
+            surname="Фамилия",
+            patronymic="Отчество",
+            email=f"{unique_name()}@example.com",
+            password="hash",
+            role_id=role.id
+        )
+        assert user is not None
+        assert len(statements) == 1
+
+    run_rolled_back(runner, scenario)
+
+
+def test_user_update_is_one_statement(runner, statements):
+    async def scenario(session):
+        _, user = await create_user(session)
+        statements.clear()
+        updated = await UserRepository(db=session).patch(user_id=user.id, name="Новое имя")
+        assert updated.name == "Новое имя"
+        assert len(statements) == 1
+
+    run_rolled_back(runner, scenario)
+
+
+def test_user_deactivate_is_one_statement(runner, statements):
+    async def scenario(session):
+        _, user = await create_user(session)
+        statements.clear()
+        deactivated = await UserRepository(db=session).patch(user_id=user.id, is_active=False)
+        assert deactivated.is_active is False
+        assert len(statements) == 1
+
+    run_rolled_back(runner, scenario)
+
+
+def test_user_change_role_is_one_statement(runner, statements):
+    async def scenario(session):
+        _, user = await create_user(session)
+        role = await RoleRepository(db=session).post(role_name=unique_name())
+        statements.clear()
+        changed = await UserRepository(db=session).change_role(user_id=user.id, role_id=role.id)
+        assert changed.role_id == role.id
+        assert len(statements) == 1
+
+    run_rolled_back(runner, scenario)
+
+
+def test_role_create_and_update_are_one_statement_each(runner, statements):
+    async def scenario(session):
+        statements.clear()
+        role = await RoleRepository(db=session).post(role_name=unique_name())
+        assert len(statements) == 1
+        statements.clear()
+        await RoleRepository(db=session).patch(role_id=role.id, write_posts_access=True)
+        assert len(statements) == 1
+
+    run_rolled_back(runner, scenario)
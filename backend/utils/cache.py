@@ -0,0 +1,351 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Coroutine
+from uuid import uuid4
+from configuration import settings
+from utils.single_flight import get_single_flight
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str], Awaitable[None]]
+InvalidationHandler = Callable[[list[str]], None]
+ResetHandler = Callable[[], None]
+
+
+class CacheBackend(ABC):
+    shared: bool = False
+
+    @abstractmethod
+    async def get(self, key: str) -> str | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, keys: list[str]) -> None:
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    async def get_counters(self, keys: list[str]) -> list[int]:
+        ...
+
+    @abstractmethod
+    async def publish(self, message: str) -> None:
+        ...
+
+    @abstractmethod
+    async def listen(self, handler: MessageHandler, on_subscribe: ResetHandler) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, keys: list[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def get_counters(self, keys: list[str]) -> list[int]:
+        return [self._counters.get(key, 0) for key in keys]
+
+    async def publish(self, message: str) -> None:
+        pass
+
+    async def listen(self, handler: MessageHandler, on_subscribe: ResetHandler) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FakeCacheBackend(MemoryCacheBackend):
+    # Every instance in the process shares one bus, so several instances behave like separate workers
+    bus: list["FakeCacheBackend"] = []
+
+    def __init__(self, max_size: int = 1024):
+        super().__init__(max_size=max_size)
+        self.published: list[str] = []
+        self._inbox: asyncio.Queue[str] = asyncio.Queue()
+        FakeCacheBackend.bus.append(self)
+
+    async def publish(self, message: str) -> None:
+        self.published.append(message)
+        for backend in FakeCacheBackend.bus:
+            backend._inbox.put_nowait(message)
+
+    async def listen(self, handler: MessageHandler, on_subscribe: ResetHandler) -> None:
+        on_subscribe()
+        while True:
+            await handler(await self._inbox.get())
+
+
+class RedisCacheBackend(CacheBackend):
+    shared = True
+
+    def __init__(self, url: str, channel: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as error:
+            raise RuntimeError("The redis cache backend requires the redis package") from error
+        self.channel = channel
+        self.client = redis.from_url(url)
+
+    async def get(self, key: str) -> str | None:
+        value = await self.client.get(key)
+        return value.decode() if value is not None else None
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await self.client.set(key, value, px=max(int(ttl * 1000), 1))
+
+    async def delete(self, keys: list[str]) -> None:
+        if keys:
+            await self.client.delete(*keys)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+    async def get_counters(self, keys: list[str]) -> list[int]:
+        return [int(value) if value is not None else 0 for value in await self.client.mget(keys)]
+
+    async def publish(self, message: str) -> None:
+        await self.client.publish(self.channel, message)
+
+    async def listen(self, handler: MessageHandler, on_subscribe: ResetHandler) -> None:
+        pubsub = self.client.pubsub()
+        try:
+            await pubsub.subscribe(self.channel)
+            on_subscribe()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    await handler(message["data"].decode())
+        finally:
+            await pubsub.aclose()
+        raise ConnectionError(f"Subscription to {self.channel} ended")
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class ReadThroughCache:
+    def __init__(
+            self,
+            backend: CacheBackend,
+            ttl: float,
+            stale_ttl: float,
+            ttl_jitter: float,
+            reconnect_delay: float,
+            max_reconnect_delay: float
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.ttl_jitter = ttl_jitter
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.origin = uuid4().hex
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.invalidations = 0
+        self.reconnects = 0
+        self._handlers: list[InvalidationHandler] = []
+        self._reset_handlers: list[ResetHandler] = []
+        self._subscribed_before = False
+        self._next_reconnect_delay = reconnect_delay
+        self._flight = get_single_flight(name="cache")
+        self._refreshing: set[str] = set()
+        self._loading: dict[str, int] = {}
+        self._generations: dict[str, int] = {}
+        self._pending: set[asyncio.Task] = set()
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = await self._read(key)
+        if entry is not None:
+            value, soft_expires_at = entry
+            if soft_expires_at > time.time() or key in self._refreshing:
+                self.hits += 1
+                return value
+            # One caller per process refreshes an entry past its soft TTL, the rest keep serving the stale copy
+            self.stale_hits += 1
+            self._refreshing.add(key)
+            try:
+                self.refreshes += 1
+                return await self._load(key=key, loader=loader)
+            finally:
+                self._refreshing.discard(key)
+
+        self.misses += 1
+        return await self._flight.do(key=key, func=lambda: self._load(key=key, loader=loader))
+
+    async def invalidate(self, keys: list[str]) -> None:
+        self.invalidations += 1
+        self._bump_generations(keys=keys)
+        await self.backend.delete(keys)
+        await self.backend.publish(json.dumps({"origin": self.origin, "keys": keys}))
+
+    def invalidate_later(self, keys: list[str]) -> None:
+        self.run_later(operation=self.invalidate(keys=keys))
+
+    def run_later(self, operation: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.get_running_loop().create_task(operation)
+        self._pending.add(task)
+        task.add_done_callback(self._finish_task)
+
+    def subscribe(self, handler: InvalidationHandler, on_reset: ResetHandler | None = None) -> None:
+        self._handlers.append(handler)
+        if on_reset is not None:
+            self._reset_handlers.append(on_reset)
+
+    async def listen(self) -> None:
+        while True:
+            try:
+                await self.backend.listen(handler=self._on_message, on_subscribe=self._on_subscribe)
+                return
+            except Exception:
+                logger.exception(
+                    "Cache invalidation listener failed, reconnecting in %.1f s",
+                    self._next_reconnect_delay
+                )
+            await asyncio.sleep(self._next_reconnect_delay)
+            self._next_reconnect_delay = min(self._next_reconnect_delay * 2, self.max_reconnect_delay)
+
+    async def close(self) -> None:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "invalidations": self.invalidations,
+            "reconnects": self.reconnects,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0
+        }
+
+    async def _read(self, key: str) -> tuple[Any, float] | None:
+        raw = await self.backend.get(key)
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["value"], entry["soft_expires_at"]
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        self._loading[key] = self._loading.get(key, 0) + 1
+        generation = self._generations.get(key, 0)
+        try:
+            value = await loader()
+            # A load that overlapped an invalidation may have read the row before the change committed
+            if self._generations.get(key, 0) != generation:
+                return value
+            if value is None:
+                await self.backend.delete([key])
+                return None
+            ttl = self.ttl * (1 - random.random() * self.ttl_jitter)
+            await self.backend.set(
+                key,
+                json.dumps({"value": value, "soft_expires_at": time.time() + ttl}),
+                ttl=ttl + self.stale_ttl
+            )
+            if self._generations.get(key, 0) != generation:
+                await self.backend.delete([key])
+            return value
+        finally:
+            self._loading[key] -= 1
+            if not self._loading[key]:
+                del self._loading[key]
+                self._generations.pop(key, None)
+
+    def _bump_generations(self, keys: list[str]) -> None:
+        # Generations are only tracked while a load of the key is in flight
+        for key in keys:
+            if key in self._loading:
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    async def _on_message(self, message: str) -> None:
+        payload = json.loads(message)
+        if payload["origin"] == self.origin:
+            return
+        self._bump_generations(keys=payload["keys"])
+        # A load here may have stored its copy between the delete of the publishing worker and this message
+        await self.backend.delete(payload["keys"])
+        for handler in self._handlers:
+            handler(payload["keys"])
+
+    def _on_subscribe(self) -> None:
+        self._next_reconnect_delay = self.reconnect_delay
+        if not self._subscribed_before:
+            self._subscribed_before = True
+            return
+        # Invalidations published while the subscription was down are lost, local copies may be stale
+        self.reconnects += 1
+        logger.warning("Cache invalidation listener reconnected, dropping local cached copies")
+        for handler in self._reset_handlers:
+            handler()
+
+    def _finish_task(self, task: asyncio.Task) -> None:
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Deferred cache operation failed", exc_info=task.exception())
+
+
+def create_cache_backend(kind: str) -> CacheBackend:
+    if kind == "memory":
+        return MemoryCacheBackend(max_size=settings.cache_max_size)
+    if kind == "fake":
+        return FakeCacheBackend(max_size=settings.cache_max_size)
+    if kind == "redis":
+        return RedisCacheBackend(url=settings.cache_redis_url, channel=settings.cache_channel)
+    raise ValueError(f"Unknown cache backend: {kind}")
+
+
+cache = ReadThroughCache(
+    backend=create_cache_backend(kind=settings.cache_backend),
+    ttl=settings.cache_ttl,
+    stale_ttl=settings.cache_stale_ttl,
+    ttl_jitter=settings.cache_ttl_jitter,
+    reconnect_delay=settings.cache_reconnect_delay,
+    max_reconnect_delay=settings.cache_max_reconnect_delay
+)
@@ -0,0 +1,56 @@
+import base64
+import json
+from uuid import UUID
+from fastapi import HTTPException, status
+
+
+def encode_cursor(values: dict) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, dict):
+            raise ValueError("Cursor must be an object")
+        return values
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор"
+        )
+
+
+def encode_id_cursor(item_id: UUID) -> str:
+    return encode_cursor({"id": str(item_id)})
+
+
+def decode_id_cursor(cursor: str | None) -> UUID | None:
+    if not cursor:
+        return None
+    try:
+        return UUID(decode_cursor(cursor)["id"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор"
+        )
+
+
+def encode_rank_cursor(rank: float, item_id: UUID) -> str:
+    return encode_cursor({"rank": rank, "id": str(item_id)})
+
+
+def decode_rank_cursor(cursor: str | None) -> tuple[float, UUID] | None:
+    if not cursor:
+        return None
+    values = decode_cursor(cursor)
+    try:
+        return float(values["rank"]), UUID(values["id"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор"
+        )
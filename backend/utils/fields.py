@@ -0,0 +1,17 @@
+from fastapi import HTTPException, status
+
+
+def parse_fields(fields: str | None, allowed: tuple[str, ...], default: tuple[str, ...]) -> list[str]:
+    if not fields:
+        return list(default)
+    selected = ["id"]
+    for field in fields.split(","):
+        field = field.strip()
+        if field not in allowed:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Неизвестное поле: {field}"
+            )
+        if field not in selected:
+            selected.append(field)
+    return selected
@@ -1,4 +1,10 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
+from configuration import settings
+from utils.metrics import BCRYPT_DURATION, HASH_POOL_QUEUE_WAIT, timed
 
 hasher = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -9,3 +15,85 @@ def get_hash(item: str) -> str:
 
 def match_hash(item: str, item_hash: str) -> bool:
     return hasher.verify(item, item_hash)
+
+
+class HashPool:
+    def __init__(self, kind: str, max_workers: int, max_queue_size: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hash pool kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.queue_depth = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hasher")
+        return self._executor
+
+    async def run(self, func, *args):
+        if self.queue_depth >= self.max_workers + self.max_queue_size:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Сервер перегружен, повторите попытку позже",
+                headers={"Retry-After": "1"}
+            )
+        loop = asyncio.get_running_loop()
+        self.queue_depth += 1
+        started = time.perf_counter()
+        job = self.executor.submit(timed, func, *args)
+        # A cancelled caller does not stop a running job, the depth drops once the worker is actually free
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(self._finish, started))
+        result, duration = await asyncio.wrap_future(job)
+        BCRYPT_DURATION.labels(operation=func.__name__).observe(duration)
+        HASH_POOL_QUEUE_WAIT.labels(operation=func.__name__).observe(time.perf_counter() - started - duration)
+        return result
+
+    def _finish(self, started: float) -> None:
+        latency = time.perf_counter() - started
+        self.queue_depth -= 1
+        self.completed += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "max_queue_size": self.max_queue_size,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "average_latency_ms": self.total_latency / self.completed * 1000 if self.completed else 0.0,
+            "max_latency_ms": self.max_latency * 1000
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+hash_pool = HashPool(
+    kind=settings.hash_pool_kind,
+    max_workers=settings.hash_pool_workers,
+    max_queue_size=settings.hash_pool_max_queue_size
+)
+
+
+async def get_hash_async(item: str) -> str:
+    return await hash_pool.run(get_hash, item)
+
+
+async def match_hash_async(item: str, item_hash: str) -> bool:
+    return await hash_pool.run(match_hash, item, item_hash)
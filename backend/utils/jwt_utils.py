@@ -1,4 +1,5 @@
-import os
+import time
+from collections import OrderedDict
 from configuration import settings
 from fastapi import HTTPException
 from datetime import datetime, timezone, timedelta
@@ -6,14 +7,49 @@ import jwt
 import uuid
 from jwt.exceptions import DecodeError
 from uuid import UUID
+from utils.key_manager import key_manager
+from utils.metrics import JWT_VERIFY_DURATION
 
 
-def encode_jwt(
-        payload: dict,
-        token_type: str,
-        private_key: str = os.getenv("PRIVATE_KEY"),
-        algorithm: str = os.getenv("ALGORITHM")
-):
+class VerifiedTokenCache:
+    def __init__(self, max_size: int, leeway: int):
+        self.max_size = max_size
+        self.leeway = leeway
+        self._tokens: OrderedDict[str, tuple[UUID, dict]] = OrderedDict()
+
+    def get(self, token: str) -> dict | None:
+        entry = self._tokens.get(token)
+        if entry is None:
+            return None
+        if entry[1]["exp"] + self.leeway <= time.time():
+            del self._tokens[token]
+            return None
+        self._tokens.move_to_end(token)
+        return entry[1]
+
+    def put(self, token: str, claims: dict) -> None:
+        if claims["exp"] + self.leeway <= time.time():
+            return
+        self._tokens[token] = (uuid.UUID(claims["sub"]), claims)
+        self._tokens.move_to_end(token)
+        while len(self._tokens) > self.max_size:
+            self._tokens.popitem(last=False)
+
+    def purge(self, token: str | None = None, user_id: UUID | None = None) -> None:
+        if token is None and user_id is None:
+            self._tokens.clear()
+            return
+        if token is not None:
+            self._tokens.pop(token, None)
+        if user_id is not None:
+            for cached_token in [t for t, (sub, _) in self._tokens.items() if sub == user_id]:
+                del self._tokens[cached_token]
+
+
+verified_tokens = VerifiedTokenCache(max_size=settings.jwt_cache_max_size, leeway=settings.jwt_leeway)
+
+
+def encode_jwt(payload: dict, token_type: str):
     if token_type == "access":
         expire_minutes = settings.expiration_time_of_access_token
     elif token_type == "refresh":
@@ -26,31 +62,53 @@ def encode_jwt(
         exp=int(expire_time.timestamp()),
         iat=int(now.timestamp())
     )
+    signing_key = key_manager.signing_key()
     encoded = jwt.encode(
         payload,
-        private_key,
-        algorithm=algorithm
+        signing_key.private_key,
+        algorithm=key_manager.algorithm,
+        headers={"kid": signing_key.kid}
     )
     return encoded
 
 
-def decode_jwt(
-        token,
-        public_key: str = os.getenv("PUBLIC_KEY"),
-        algorithm: str = os.getenv("ALGORITHM")
-):
+def decode_jwt_claims(token) -> dict:
+    claims = verified_tokens.get(token)
+    if claims is not None:
+        return claims
     try:
+        public_key = key_manager.verification_key(kid=jwt.get_unverified_header(token).get("kid"))
+        if public_key is None:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        started = time.perf_counter()
         decoded = jwt.decode(
             token,
             public_key,
-            algorithms=[algorithm],
-            leeway=10
+            algorithms=[key_manager.algorithm],
+            leeway=settings.jwt_leeway
         )
-        return uuid.UUID(decoded["sub"])
+        JWT_VERIFY_DURATION.observe(time.perf_counter() - started)
+        verified_tokens.put(token=token, claims=decoded)
+        return decoded
     except DecodeError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
-def generate_token(user_id: UUID, token_type: str):
+def decode_jwt(token) -> UUID:
+    return uuid.UUID(decode_jwt_claims(token=token)["sub"])
+
+
+def purge_verified_tokens(token: str | None = None, user_id: UUID | None = None):
+    verified_tokens.purge(token=token, user_id=user_id)
+
+
+def reload_keys():
+    key_manager.load()
+    verified_tokens.purge()
+
+
+def generate_token(user_id: UUID, token_type: str, claims: dict | None = None):
     payload = {"sub": str(user_id)}
+    if claims is not None:
+        payload.update(claims)
     return encode_jwt(payload=payload, token_type=token_type)
@@ -0,0 +1,90 @@
+import os
+from jwt.algorithms import get_default_algorithms
+from configuration import settings
+
+
+class SigningKey:
+    def __init__(self, kid: str, private_key, public_key):
+        self.kid = kid
+        self.private_key = private_key
+        self.public_key = public_key
+
+
+class KeyManager:
+    def __init__(
+            self,
+            algorithm: str,
+            active_kid: str,
+            keys_dir: str | None = None,
+            private_pem: str | None = None,
+            public_pem: str | None = None
+    ):
+        if algorithm.startswith("HS"):
+            raise ValueError("KeyManager supports asymmetric algorithms only")
+        self.algorithm = algorithm
+        self.active_kid = active_kid
+        self.keys_dir = keys_dir
+        self.private_pem = private_pem
+        self.public_pem = public_pem
+        self._algorithm = get_default_algorithms()[algorithm]
+        self._keys: dict[str, SigningKey] = {}
+
+    def load(self) -> None:
+        keys: dict[str, SigningKey] = {}
+        if self.private_pem or self.public_pem:
+            keys[self.active_kid] = self._parse(kid=self.active_kid, pem=self.private_pem or self.public_pem)
+        if self.keys_dir:
+            for file_name in sorted(os.listdir(self.keys_dir)):
+                if file_name.endswith(".pub.pem"):
+                    kid = file_name.removesuffix(".pub.pem")
+                elif file_name.endswith(".pem"):
+                    kid = file_name.removesuffix(".pem")
+                else:
+                    continue
+                if kid in keys and keys[kid].private_key is not None:
+                    continue
+                with open(os.path.join(self.keys_dir, file_name)) as key_file:
+                    keys[kid] = self._parse(kid=kid, pem=key_file.read())
+        if self.active_kid not in keys or keys[self.active_kid].private_key is None:
+            raise RuntimeError(f"No private key loaded for active kid '{self.active_kid}'")
+        self._keys = keys
+
+    def add_key(self, kid: str, pem: str) -> None:
+        self._keys[kid] = self._parse(kid=kid, pem=pem)
+
+    def signing_key(self) -> SigningKey:
+        self._ensure_loaded()
+        return self._keys[self.active_kid]
+
+    def verification_key(self, kid: str | None):
+        self._ensure_loaded()
+        key = self._keys.get(kid or self.active_kid)
+        return key.public_key if key is not None else None
+
+    def jwks(self) -> dict:
+        self._ensure_loaded()
+        keys = []
+        for key in self._keys.values():
+            jwk = self._algorithm.to_jwk(key.public_key, as_dict=True)
+            jwk.update(kid=key.kid, use="sig", alg=self.algorithm)
+            keys.append(jwk)
+        return {"keys": keys}
+
+    def _parse(self, kid: str, pem: str) -> SigningKey:
+        key = self._algorithm.prepare_key(pem)
+        if hasattr(key, "public_key"):
+            return SigningKey(kid=kid, private_key=key, public_key=key.public_key())
+        return SigningKey(kid=kid, private_key=None, public_key=key)
+
+    def _ensure_loaded(self) -> None:
+        if not self._keys:
+            self.load()
+
+
+key_manager = KeyManager(
+    algorithm=settings.algorithm,
+    active_kid=settings.jwt_active_kid,
+    keys_dir=settings.jwt_keys_dir,
+    private_pem=settings.private_key,
+    public_pem=settings.public_key
+)
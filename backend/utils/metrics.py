@@ -0,0 +1,111 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Callable
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+StatsSource = Callable[[], dict | list[dict]]
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route",
+    ["method", "route", "status"]
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests being handled by route",
+    ["method", "route"],
+    multiprocess_mode="livesum"
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries executed per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50, 100)
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Database time spent per request",
+    ["method", "route"]
+)
+BCRYPT_DURATION = Histogram(
+    "bcrypt_duration_seconds",
+    "bcrypt hashing and verification time, without the hash pool queue",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.5)
+)
+HASH_POOL_QUEUE_WAIT = Histogram(
+    "hash_pool_queue_wait_seconds",
+    "Time a bcrypt call waited for a hash pool worker",
+    ["operation"]
+)
+JWT_VERIFY_DURATION = Histogram(
+    "jwt_verify_duration_seconds",
+    "JWT signature verification time",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025)
+)
+
+
+class RequestCost:
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+
+request_cost: ContextVar[RequestCost | None] = ContextVar("request_cost", default=None)
+
+
+def observe_query(duration: float) -> None:
+    cost = request_cost.get()
+    if cost is not None:
+        cost.queries += 1
+        cost.duration += duration
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+class StatsCollector:
+    def __init__(self):
+        self.sources: dict[str, StatsSource] = {}
+
+    def add_source(self, name: str, source: StatsSource) -> None:
+        self.sources[name] = source
+
+    def collect(self):
+        for source_name, source in self.sources.items():
+            stats = source()
+            rows = stats if isinstance(stats, list) else [stats]
+            families: dict[str, GaugeMetricFamily] = {}
+            for row in rows:
+                labels = {key: str(value) for key, value in row.items() if isinstance(value, str)}
+                for key, value in row.items():
+                    if isinstance(value, str):
+                        continue
+                    if key not in families:
+                        families[key] = GaugeMetricFamily(
+                            f"app_{source_name}_{key}",
+                            f"{source_name} {key.replace('_', ' ')}",
+                            labels=list(labels)
+                        )
+                    families[key].add_metric(list(labels.values()), float(value))
+            yield from families.values()
+
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    # Every worker writes its samples to the shared directory; the stats of this worker are added as they are
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry)
+    registry.register(stats_collector)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,99 @@
+from typing import Awaitable, Callable
+from uuid import UUID
+from configuration import settings
+from models.role import Role
+from schemas.internal.principal_schemas import PrincipalSchema
+from schemas.internal.role_rights_schemas import RoleRightsSchema
+from utils.cache import CacheBackend, cache
+
+READ_POSTS = 1
+WRITE_POSTS = 2
+DELETE_POSTS = 4
+MANAGE_ROLES = 8
+
+
+class PermissionVersions:
+    # Counters live in the cache backend, so every worker compares claims against the same numbers
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    async def get(self, role_id: UUID, user_id: UUID) -> tuple[int, int]:
+        role_version, user_version = await self.backend.get_counters(
+            [self.key(kind="role", key_id=role_id), self.key(kind="user", key_id=user_id)]
+        )
+        return role_version, user_version
+
+    async def bump(self, kind: str, key_id: UUID) -> None:
+        await self.backend.incr(self.key(kind=kind, key_id=key_id))
+
+    def bump_later(self, kind: str, key_id: UUID) -> None:
+        cache.run_later(operation=self.bump(kind=kind, key_id=key_id))
+
+    @staticmethod
+    def key(kind: str, key_id: UUID) -> str:
+        return f"permission-version:{kind}:{key_id}"
+
+
+permission_versions = PermissionVersions(backend=cache.backend)
+
+
+def claims_enabled() -> bool:
+    # A per-process backend cannot tell one worker about a revocation handled by another
+    return settings.stateless_authorization and permission_versions.backend.shared
+
+
+def encode_permissions(role: Role) -> int:
+    mask = 0
+    if role.read_posts_access:
+        mask |= READ_POSTS
+    if role.write_posts_access:
+        mask |= WRITE_POSTS
+    if role.delete_posts_access:
+        mask |= DELETE_POSTS
+    if role.manage_roles_access:
+        mask |= MANAGE_ROLES
+    return mask
+
+
+def decode_permissions(mask: int) -> RoleRightsSchema:
+    return RoleRightsSchema(
+        read_posts_access=bool(mask & READ_POSTS),
+        write_posts_access=bool(mask & WRITE_POSTS),
+        delete_posts_access=bool(mask & DELETE_POSTS),
+        manage_roles_access=bool(mask & MANAGE_ROLES)
+    )
+
+
+async def permission_claims(
+        user_id: UUID,
+        role_id: UUID,
+        load_role: Callable[[], Awaitable[Role | None]]
+) -> dict | None:
+    if not claims_enabled():
+        return None
+    # Versions are read before the role, so a change committed in between leaves the token untrusted
+    role_version, user_version = await permission_versions.get(role_id=role_id, user_id=user_id)
+    role = await load_role()
+    if role is None or role.id != role_id:
+        return None
+    return {
+        "rid": str(role.id),
+        "prm": encode_permissions(role),
+        "rv": role_version,
+        "uv": user_version
+    }
+
+
+async def principal_from_claims(claims: dict) -> PrincipalSchema | None:
+    if "prm" not in claims or not claims_enabled():
+        return None
+    user_id = UUID(claims["sub"])
+    role_id = UUID(claims["rid"])
+    # Any other version, including counters lost with the store, falls back to the database
+    if await permission_versions.get(role_id=role_id, user_id=user_id) != (claims["rv"], claims["uv"]):
+        return None
+    return PrincipalSchema(
+        user_id=user_id,
+        role_id=role_id,
+        role_rights=decode_permissions(mask=claims["prm"])
+    )
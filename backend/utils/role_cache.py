@@ -0,0 +1,88 @@
+import time
+from collections import OrderedDict
+from uuid import UUID
+from sqlalchemy.orm import make_transient_to_detached
+from configuration import settings
+from utils.cache import cache
+from models.role import Role
+
+
+class RoleCache:
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._roles: OrderedDict[UUID, tuple[float, Role]] = OrderedDict()
+        self._ids_by_name: dict[str, UUID] = {}
+
+    def get_by_id(self, role_id: UUID) -> Role | None:
+        entry = self._roles.get(role_id)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                self._evict(role_id)
+            self.misses += 1
+            return None
+        self._roles.move_to_end(role_id)
+        self.hits += 1
+        return entry[1]
+
+    def get_by_name(self, name: str) -> Role | None:
+        role_id = self._ids_by_name.get(name)
+        if role_id is None:
+            self.misses += 1
+            return None
+        return self.get_by_id(role_id)
+
+    def put(self, role: Role) -> Role:
+        snapshot = Role(
+            id=role.id,
+            name=role.name,
+            read_posts_access=role.read_posts_access,
+            write_posts_access=role.write_posts_access,
+            delete_posts_access=role.delete_posts_access,
+            manage_roles_access=role.manage_roles_access
+        )
+        make_transient_to_detached(snapshot)
+        self._evict(role.id)
+        self._roles[role.id] = (time.monotonic() + self.ttl, snapshot)
+        self._ids_by_name[role.name] = role.id
+        while len(self._roles) > self.max_size:
+            self._evict(next(iter(self._roles)))
+        return snapshot
+
+    def invalidate(self, role_id: UUID | None = None, name: str | None = None) -> None:
+        if role_id is None and name is None:
+            self._roles.clear()
+            self._ids_by_name.clear()
+            return
+        if name is not None and name in self._ids_by_name:
+            self._evict(self._ids_by_name[name])
+        if role_id is not None:
+            self._evict(role_id)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._roles),
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+    def _evict(self, role_id: UUID) -> None:
+        entry = self._roles.pop(role_id, None)
+        if entry is not None and self._ids_by_name.get(entry[1].name) == role_id:
+            del self._ids_by_name[entry[1].name]
+
+
+role_cache = RoleCache(ttl=settings.role_cache_ttl, max_size=settings.role_cache_max_size)
+
+
+def evict_invalidated_roles(keys: list[str]) -> None:
+    for key in keys:
+        if key.startswith("role:"):
+            role_cache.invalidate(role_id=UUID(key.removeprefix("role:")))
+
+
+cache.subscribe(handler=evict_invalidated_roles, on_reset=role_cache.invalidate)
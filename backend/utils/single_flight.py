@@ -0,0 +1,77 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.retries = 0
+        self._flights: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        joined = False
+        while True:
+            flight = self._flights.get(key)
+            if flight is None:
+                if joined:
+                    self.coalesced -= 1
+                return await self._lead(key=key, func=func)
+            if not joined:
+                self.coalesced += 1
+                joined = True
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                # A cancelled leader must not take its followers down with it: the next one in line retries
+                if not flight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                self.retries += 1
+
+    async def _lead(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        flight = asyncio.get_running_loop().create_future()
+        flight.add_done_callback(self._consume)
+        self._flights[key] = flight
+        self.executions += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as error:
+            flight.set_exception(error)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "in_flight": len(self._flights),
+            "coalescing_ratio": self.coalesced / self.calls if self.calls else 0.0
+        }
+
+    @staticmethod
+    def _consume(flight: asyncio.Future) -> None:
+        if not flight.cancelled():
+            flight.exception()
+
+
+single_flights: dict[str, SingleFlight] = {}
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    if name not in single_flights:
+        single_flights[name] = SingleFlight(name=name)
+    return single_flights[name]